@@ -0,0 +1,224 @@
+"""Headless benchmark runner.
+
+    python -m bench.run                          run every scenario, compare with bench/baseline.json
+    python -m bench.run -s raid_2000_enemies --param enemies=5000
+    python -m bench.run --update-baseline        store this machine's results as the baseline
+    python -m bench.run --baseline my.json --update-baseline
+
+Each scenario runs in its own process under SDL's dummy drivers with a
+scratch save directory, so peak memory and save files are per scenario.
+
+Timings only compare cleanly on the machine that recorded them. The
+baseline stores the recording machine and a calibration time (a fixed
+python/numpy/blit workload); on another machine time metrics are scaled
+by the calibration ratio before the tolerance check, which is rougher.
+To check a change precisely, record a baseline on the same machine
+first: check out the parent commit, run with --update-baseline (use
+--baseline to keep it out of the tree), then run the change against it.
+Regenerate bench/baseline.json with --update-baseline whenever a
+scenario changes or the reference machine does.
+"""
+import argparse, json, os, platform, shutil, subprocess, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BASELINE_FILE = os.path.join(ROOT, 'bench', 'baseline.json')
+# relative change from the baseline that counts as a regression
+DEFAULT_TOLERANCE = 0.25
+HIGHER_IS_BETTER = ('ticks_per_sec', 'save_load_mb_per_s')
+# fixed so results don't depend on the local config.json or the display
+RENDER_SIZE = (1280, 720)
+TIME_METRICS = ('p50_ms', 'p99_ms')
+CALIBRATION_RUNS = 5
+
+
+def machine_id():
+    return {
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+        'python': platform.python_version(),
+    }
+
+
+def calibrate():
+    """Best of a few runs of a fixed workload shaped like a scene tick, in ms."""
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+    import numpy as np
+    import pygame
+    screen = pygame.Surface(RENDER_SIZE)
+    sprite = pygame.Surface((32, 32))
+    rng = np.random.default_rng(0)
+    pos = rng.random((2000, 2)) * RENDER_SIZE
+    best = None
+    for _ in range(CALIBRATION_RUNS):
+        start = time.perf_counter()
+        cells = {}
+        for i in range(20000):
+            cells.setdefault(i % 97, []).append(i)
+        for _ in range(20):
+            d = pos - pos.mean(axis=0)
+            pos = (pos + d / (np.hypot(d[:, 0], d[:, 1])[:, None] + 1.0)) % RENDER_SIZE
+        screen.blits([(sprite, (int(x), int(y))) for x, y in pos], doreturn=False)
+        took = (time.perf_counter() - start) * 1000
+        best = took if best is None else min(best, took)
+    return best
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))] if values else 0.0
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_child(name, params):
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    sys.path.insert(0, ROOT)
+    from systems import save_load
+    from bench.scenarios import SCENARIOS, ScriptedInput
+    fn, defaults, start_scene = SCENARIOS[name]
+    kwargs = dict(defaults)
+    kwargs.update(params)
+    scratch = tempfile.mkdtemp(prefix='bench_saves_')
+    try:
+        save_load.use_save_dir(scratch)
+        import main
+        game = main.Game(render_size=RENDER_SIZE)
+        game.input = ScriptedInput()
+        save_load.new_game(1, 'bench')
+        game.switch_scene(start_scene)
+        result = fn(game, **kwargs)
+        costs, extra = result if isinstance(result, tuple) else (result, {})
+        save_load.session.close()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    total_s = sum(costs) / 1000
+    metrics = {
+        'ticks_per_sec': len(costs) / total_s if total_s else 0.0,
+        'p50_ms': _percentile(costs, 50),
+        'p99_ms': _percentile(costs, 99),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+    metrics.update(extra)
+    return metrics
+
+
+def run_scenario(name, params):
+    cmd = [sys.executable, '-m', 'bench.run', '--child', name, '--params', json.dumps(params)]
+    out = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(f'{name} failed:\n{out.stderr}')
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def load_baseline(path):
+    try:
+        with open(path, 'r') as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return {'scenarios': {}}
+    if 'scenarios' not in baseline:
+        # older files held the scenarios at the top level and no machine
+        baseline = {'scenarios': baseline}
+    return baseline
+
+
+def speed_ratio(baseline, calibration_ms):
+    """How much slower this machine is than the one that recorded the baseline."""
+    if baseline.get('machine') == machine_id():
+        return 1.0
+    ref = baseline.get('calibration_ms')
+    return calibration_ms / ref if ref and calibration_ms else 1.0
+
+
+def compare(results, baseline, tolerance, ratio=1.0):
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            ref = baseline.get(name, {}).get(metric)
+            if ref is None or value is None or not ref:
+                continue
+            if metric in HIGHER_IS_BETTER:
+                ref /= ratio
+            elif metric in TIME_METRICS:
+                ref *= ratio
+            change = (value - ref) / ref
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append((name, metric, ref, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless scene and persistence benchmarks')
+    parser.add_argument('-s', '--scenario', action='append', help='scenario name, repeatable (default: all)')
+    parser.add_argument('--param', action='append', default=[], help='override a scenario parameter, e.g. enemies=5000')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='baseline file to compare with or update')
+    parser.add_argument('--list', action='store_true')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--params', default='{}', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.child, json.loads(args.params))))
+        return 0
+
+    sys.path.insert(0, ROOT)
+    from bench.scenarios import SCENARIOS
+    if args.list:
+        for name, (_, defaults, _) in SCENARIOS.items():
+            print(f'{name:32} {defaults}')
+        return 0
+    params = {}
+    for item in args.param:
+        key, _, value = item.partition('=')
+        params[key] = int(value)
+    names = args.scenario or list(SCENARIOS)
+    results = {}
+    for name in names:
+        scenario_params = {k: v for k, v in params.items() if k in SCENARIOS[name][1]}
+        results[name] = run_scenario(name, scenario_params)
+        m = results[name]
+        extra = ''.join(f'  {k} {v:.2f}' for k, v in m.items() if k not in ('ticks_per_sec', 'p50_ms', 'p99_ms', 'peak_rss_mb'))
+        rss = f"{m['peak_rss_mb']:.0f}MB" if m['peak_rss_mb'] is not None else 'n/a'
+        print(f"{name:32} {m['ticks_per_sec']:10.1f}/s  p50 {m['p50_ms']:7.3f}ms  p99 {m['p99_ms']:7.3f}ms  rss {rss}{extra}")
+
+    baseline = load_baseline(args.baseline)
+    calibration_ms = calibrate()
+    if args.update_baseline:
+        if baseline.get('machine') != machine_id():
+            # timings from two machines can't share a file
+            if baseline['scenarios']:
+                print('baseline was recorded on another machine, starting a new one')
+            baseline = {'scenarios': {}}
+        baseline['machine'] = machine_id()
+        baseline['calibration_ms'] = calibration_ms
+        baseline['scenarios'].update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f'baseline written to {args.baseline}')
+        return 0
+    ratio = speed_ratio(baseline, calibration_ms)
+    if ratio != 1.0:
+        print(f'baseline was recorded on another machine, timings scaled by {ratio:.2f}; '
+              f'rerun with --update-baseline on this machine for an exact comparison')
+    regressions = compare(results, baseline['scenarios'], args.tolerance, ratio)
+    for name, metric, ref, value in regressions:
+        print(f'REGRESSION {name} {metric}: {ref:.3f} -> {value:.3f}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
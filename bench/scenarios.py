@@ -0,0 +1,162 @@
+import os
+import random
+import time
+import pygame
+from systems import save_load
+from systems.input_state import InputState
+
+
+class KeySet:
+    """Stands in for pygame.key.get_pressed() with a fixed set of held keys."""
+
+    def __init__(self, keys=()):
+        self.down = set(keys)
+
+    def __getitem__(self, key):
+        return key in self.down
+
+
+class ScriptedInput(InputState):
+    """InputState whose values are set by the scenario instead of read from pygame."""
+
+    def __init__(self):
+        super().__init__()
+        self.keys = KeySet()
+
+    def capture(self):
+        pass
+
+
+def key_event(key):
+    return pygame.event.Event(pygame.KEYDOWN, key=key, mod=0, unicode='', scancode=0, repeat=False)
+
+
+def click_events(pos, button=1):
+    return [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=button),
+            pygame.event.Event(pygame.MOUSEBUTTONUP, pos=pos, button=button)]
+
+
+def run_frames(game, frames, script=None):
+    # drives Game.frame with one simulation tick per frame and returns each
+    # frame's cost in ms
+    costs = []
+    for i in range(frames):
+        start = time.perf_counter()
+        events = script(game, i) if script else ()
+        game.frame(game.dt_ms, list(events or ()))
+        costs.append((time.perf_counter() - start) * 1000)
+    return costs
+
+
+def _walk_and_swing(game, i):
+    # strafe in a square and swing every 20 frames
+    keys = (pygame.K_d, pygame.K_s, pygame.K_a, pygame.K_w)[(i // 60) % 4]
+    game.input.keys = KeySet([keys])
+    game.input.mouse_pos = (400 + 200 * ((i // 30) % 2), 300)
+    if i % 20 == 0:
+        return click_events(game.input.mouse_pos)
+    return ()
+
+
+def base_structures(game, frames=600, structures=5000):
+    scene = game.current_scene
+    types = ["Wall", "Door", "Workbench", "FarmPlot"]
+    rng = random.Random(1)
+    placed = []
+    for i in range(structures):
+        rect = pygame.Rect((i % 100) * 40, (i // 100) * 40, 40, 40)
+        placed.append({"type": rng.choice(types), "rect": rect})
+    scene.set_structures(placed)
+    save_load.save_base_state(placed_structures=placed)
+    def script(game, i):
+        if i % 150 == 0:
+            return [key_event(pygame.K_TAB)]
+        return _walk_and_swing(game, i)
+    return run_frames(game, frames, script)
+
+
+def raid_enemies(game, frames=600, enemies=2000):
+    game.switch_scene('raid')
+    scene = game.current_scene
+    rng = random.Random(2)
+    scene.horde.clear()
+    points = [(rng.randint(0, 1200), rng.randint(0, 680)) for _ in range(enemies)]
+    scene.horde.spawn([x for x, _ in points], [y for _, y in points])
+    return run_frames(game, frames, _walk_and_swing)
+
+
+def inventory_mutations(game, frames=0, mutations=10000):
+    scene = game.current_scene
+    items = ["Wood", "Stone", "Metal", "Food"]
+    costs = []
+    for i in range(mutations):
+        start = time.perf_counter()
+        if i % 3 == 2:
+            scene.remove_items(items[i % 4], 1)
+        else:
+            scene.add_item(items[i % 4], 1 + i % 5)
+        costs.append((time.perf_counter() - start) * 1000)
+    return costs
+
+
+def scene_switching(game, frames=0, cycles=200):
+    costs = []
+    for i in range(cycles):
+        start = time.perf_counter()
+        game.switch_scene('raid' if i % 2 == 0 else 'base')
+        run_frames(game, 1)
+        costs.append((time.perf_counter() - start) * 1000)
+    return costs
+
+
+def menu_frames(game, frames=600):
+    game.switch_scene('menu')
+    def script(game, i):
+        game.input.mouse_pos = (game.screen.get_width() // 2, 200 + (i % 300))
+        return [pygame.event.Event(pygame.MOUSEMOTION, pos=game.input.mouse_pos, rel=(0, 1), buttons=(0, 0, 0))]
+    return run_frames(game, frames, script)
+
+
+def saves_frames(game, frames=600, slots=100):
+    for i in range(2, slots + 1):
+        save_load.new_game(i, f'bench {i}', overwrite=True)
+    game.switch_scene('saves')
+    def script(game, i):
+        if i % 60 == 0:
+            return [pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=-1, flipped=False)]
+        return ()
+    return run_frames(game, frames, script)
+
+
+def persistence(game, frames=0, structures=5000, rounds=20):
+    # save + reload round trips of a large slot; throughput counts the bytes read back
+    placed = [{"type": "Wall", "rect": pygame.Rect((i % 100) * 40, (i // 100) * 40, 40, 40)} for i in range(structures)]
+    save_load.save_base_state(placed_structures=placed)
+    save_load.session.flush()
+    save_load.session.wait()
+    slot = save_load.session.slot
+    costs = []
+    moved = 0
+    for i in range(rounds):
+        start = time.perf_counter()
+        save_load.add_structure({"type": "Door", "rect": pygame.Rect(i * 40, -40, 40, 40)})
+        save_load.session.flush()
+        save_load.session.wait()
+        save_load.session.discard()
+        save_load.load_save()
+        costs.append((time.perf_counter() - start) * 1000)
+        moved += sum(os.path.getsize(p) for p in (save_load._slot_file(slot), save_load._journal_file(slot)) if os.path.exists(p))
+    return costs, {"save_load_mb_per_s": moved / 1e6 / (sum(costs) / 1000)}
+
+
+# name -> (function, default parameters, scene to start in); a function returns
+# per-operation costs in ms, optionally with a dict of extra metrics
+SCENARIOS = {
+    "base_5000_structures": (base_structures, {"frames": 600, "structures": 5000}, "base"),
+    "raid_2000_enemies": (raid_enemies, {"frames": 600, "enemies": 2000}, "base"),
+    "inventory_10000_mutations": (inventory_mutations, {"mutations": 10000}, "base"),
+    "scene_switch_200": (scene_switching, {"cycles": 200}, "base"),
+    "menu_idle": (menu_frames, {"frames": 600}, "menu"),
+    "saves_100_slots": (saves_frames, {"frames": 600, "slots": 100}, "menu"),
+    "persistence_5000_structures": (persistence, {"structures": 5000, "rounds": 20}, "base"),
+}
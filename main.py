@@ -1,52 +1,362 @@
+import argparse, os, shutil, sys, tempfile, time
 import pygame
-import sys
 from scenes.menu import MenuScene
 from scenes.base import BaseScene
 from scenes.raid import RaidScene
 from scenes.saves import SavesScene
 from scenes.settings import SettingsScene
+from systems import atlas, save_load
+from systems.config import load_config, render_size
+from systems.input_state import InputState
+from systems.profiler import profiler
+from systems.replay import InputRecorder, Replay, ReplayInput, snapshot_saves
+from systems.rng import SessionRNG
+
+SCENES = {
+    "menu": MenuScene,
+    "base": BaseScene,
+    "raid": RaidScene,
+    "saves": SavesScene,
+    "settings": SettingsScene,
+}
+# scenes built from the active save; their cached instance is dropped when it changes
+SLOT_SCENES = ("base", "raid")
+# scene most likely to be opened next, built ahead of time while the current one idles
+PRELOAD_NEXT = {"menu": "base", "base": "raid", "raid": "base"}
+PRELOAD_DELAY_FRAMES = 30
+# simulation ticks a single frame may run to catch up before the backlog is dropped
+MAX_CATCHUP_TICKS = 5
+# frame rate while a dirty-rendering scene has nothing to redraw
+IDLE_FPS = 20
 
 class Game:
-    def __init__(self):
+    def __init__(self, seed=None, render_size=None, sim_hz=None):
         pygame.init()
+        save_load.migrate_legacy_if_needed()
+        self.rng = SessionRNG(seed)
+        # replays draw at the recorded size, unscaled, whatever the config says
+        self.forced_render_size = render_size
+        self.recorder = None
         self.fullscreen = True
+        self.display_generation = 0
+        # name -> (scene, save generation, display generation)
+        self.scene_cache = {}
+        # (name, scene, remaining load steps, save generation) while a preload is under way
+        self.preloading = None
         self._apply_display_mode()
         pygame.display.set_caption("The Last Base")
+        # built (or read from cache/) once the display exists, before any scene needs it
+        atlas.get_atlas()
         pygame.event.set_grab(True)
         self.clock = pygame.time.Clock()
-        self.current_scene = MenuScene(self)
+        cfg = load_config()
+        self.sim_hz = sim_hz or cfg['sim_hz']
+        self.fps_cap = cfg['fps_cap']
+        # every update() advances the simulation by exactly dt_ms
+        self.dt_ms = 1000.0 / self.sim_hz
+        self.sim_time_ms = 0.0
+        self.accumulator = 0.0
+        # how far between the last two ticks the current frame is, for draw interpolation
+        self.alpha = 0.0
+        self.input = InputState()
+        self.input.to_render = self.display_to_render
+        self.current_scene = None
+        self.current_scene_name = None
+        self.preload_name = None
+        self.preload_countdown = 0
+        # forces the next frame to redraw the whole screen
+        self.full_redraw = True
+        self.idle = False
+        self.switch_scene("menu")
     def _apply_display_mode(self):
-        if self.fullscreen:
-            self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        # scenes draw on self.screen at the configured render size; it is scaled
+        # into self.display, letterboxed, once per presented frame
+        cfg = load_config()
+        if self.forced_render_size:
+            size = tuple(self.forced_render_size)
+            self.display = pygame.display.set_mode(size)
         else:
-            self.screen = pygame.display.set_mode((1280, 720))
-    def toggle_fullscreen(self):
-        self.fullscreen = not self.fullscreen
+            size = render_size(cfg)
+            if self.fullscreen:
+                self.display = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            else:
+                desktop = pygame.display.get_desktop_sizes()[0]
+                w, h = cfg['resolution']
+                self.display = pygame.display.set_mode((min(w, desktop[0]), min(h, desktop[1])))
+        self.screen = self.display if size == self.display.get_size() else pygame.Surface(size).convert()
+        dw, dh = self.display.get_size()
+        self.present_scale = min(dw / size[0], dh / size[1])
+        pw, ph = round(size[0] * self.present_scale), round(size[1] * self.present_scale)
+        self.present_rect = pygame.Rect((dw - pw) // 2, (dh - ph) // 2, pw, ph)
+        self.present_target = self.display.subsurface(self.present_rect) if self.screen is not self.display else None
+        self.display_generation += 1
+        for scene, _, _ in self.scene_cache.values():
+            scene.screen = self.screen
+        # a half-built scene still holds the old screen
+        self.preloading = None
+    def display_to_render(self, pos):
+        if self.screen is self.display:
+            return pos
+        x = (pos[0] - self.present_rect.x) / self.present_scale
+        y = (pos[1] - self.present_rect.y) / self.present_scale
+        w, h = self.screen.get_size()
+        return min(max(int(x), 0), w - 1), min(max(int(y), 0), h - 1)
+    def _map_event(self, event):
+        if hasattr(event, 'pos'):
+            event.pos = self.display_to_render(event.pos)
+            if hasattr(event, 'rel'):
+                event.rel = (int(event.rel[0] / self.present_scale), int(event.rel[1] / self.present_scale))
+        return event
+    def _present(self, rects):
+        # rects: render-space areas that changed, None for the whole frame
+        if self.screen is self.display:
+            if rects is None:
+                pygame.display.flip()
+            elif rects:
+                pygame.display.update(rects)
+            return
+        if rects is None:
+            self.display.fill((0, 0, 0))
+            pygame.transform.scale(self.screen, self.present_rect.size, self.present_target)
+            pygame.display.flip()
+            return
+        s, ox, oy = self.present_scale, self.present_rect.x, self.present_rect.y
+        bounds = self.screen.get_rect()
+        updated = []
+        for r in rects:
+            r = r.clip(bounds)
+            if not r.w or not r.h:
+                continue
+            d = pygame.Rect(ox + int(r.x * s), oy + int(r.y * s), max(1, round(r.w * s)), max(1, round(r.h * s))).clip(self.present_rect)
+            pygame.transform.scale(self.screen.subsurface(r), d.size, self.display.subsurface(d))
+            updated.append(d)
+        if updated:
+            pygame.display.update(updated)
+    def apply_display_settings(self):
+        # after a fullscreen, resolution or render scale change
         self._apply_display_mode()
+        self.full_redraw = True
         pygame.event.set_grab(True)
         if hasattr(self.current_scene, 'on_resize'):
             self.current_scene.on_resize()
+        if self.current_scene_name in self.scene_cache:
+            scene, save_gen, _ = self.scene_cache[self.current_scene_name]
+            self.scene_cache[self.current_scene_name] = (scene, save_gen, self.display_generation)
+    def toggle_fullscreen(self):
+        self.fullscreen = not self.fullscreen
+        self.apply_display_settings()
+    def _save_generation(self, scene_name):
+        if scene_name not in SLOT_SCENES:
+            return None
+        save_load.session.get()
+        return save_load.session.generation
+    def _new_scene(self, scene_name):
+        # a scene may keep its heavier setup in a load_steps() generator, so a
+        # preload can spread it over frames; built here, it runs to the end
+        scene = SCENES[scene_name](self)
+        if hasattr(scene, 'load_steps'):
+            for _ in scene.load_steps():
+                pass
+        return scene
+    def _finish_preload(self, scene_name):
+        if self.preloading is None or self.preloading[0] != scene_name:
+            return
+        name, scene, steps, save_gen = self.preloading
+        self.preloading = None
+        for _ in steps:
+            pass
+        self.scene_cache[name] = (scene, save_gen, self.display_generation)
+    def _get_scene(self, scene_name):
+        # switching to the scene being preloaded runs its remaining steps now
+        self._finish_preload(scene_name)
+        save_gen = self._save_generation(scene_name)
+        cached = self.scene_cache.get(scene_name)
+        if cached is not None and cached[1] == save_gen:
+            scene, _, display_gen = cached
+            if display_gen != self.display_generation and hasattr(scene, 'on_resize'):
+                scene.on_resize()
+        else:
+            scene = self._new_scene(scene_name)
+        self.scene_cache[scene_name] = (scene, save_gen, self.display_generation)
+        return scene
     def switch_scene(self, scene_name):
-        if scene_name == "menu":
-            self.current_scene = MenuScene(self)
-        elif scene_name == "base":
-            self.current_scene = BaseScene(self)
-        elif scene_name == "raid":
-            self.current_scene = RaidScene(self)
-        elif scene_name == "saves":
-            self.current_scene = SavesScene(self)
-        elif scene_name == "settings":
-            self.current_scene = SettingsScene(self)
-    def run(self):
-        while True:
-            for event in pygame.event.get():
+        if self.current_scene is not None and hasattr(self.current_scene, 'on_exit'):
+            # a scene built from a save that has since been replaced must not write into the new one
+            cached = self.scene_cache.get(self.current_scene_name)
+            if cached is None or cached[1] == self._save_generation(self.current_scene_name):
+                self.current_scene.on_exit()
+        # after on_exit, so what the scene saved on the way out goes with this flush
+        save_load.session.flush()
+        save_load.session.refresh_preview()
+        self.current_scene = self._get_scene(scene_name)
+        self.current_scene_name = scene_name
+        if hasattr(self.current_scene, 'on_enter'):
+            self.current_scene.on_enter()
+        self.preload_name = PRELOAD_NEXT.get(scene_name)
+        self.preload_countdown = PRELOAD_DELAY_FRAMES
+        self.full_redraw = True
+    def _preload_tick(self):
+        # build the likely next scene once the current one has settled, so the
+        # switch itself only runs on_enter. Construction is cheap; its load
+        # steps run one per frame. It stays on the main thread because scenes
+        # read and write the save session and the shared RNG while they load,
+        # and neither is guarded for a second thread.
+        if self.preloading is not None:
+            name, scene, steps, save_gen = self.preloading
+            if next(steps, StopIteration) is StopIteration:
+                self.preloading = None
+                self.scene_cache[name] = (scene, save_gen, self.display_generation)
+            return
+        if self.preload_name is None:
+            return
+        self.preload_countdown -= 1
+        if self.preload_countdown > 0:
+            return
+        name, self.preload_name = self.preload_name, None
+        if name in SLOT_SCENES and save_load.get_active_slot() is None:
+            return
+        save_gen = self._save_generation(name)
+        cached = self.scene_cache.get(name)
+        if cached is None or cached[1] != save_gen:
+            scene = SCENES[name](self)
+            steps = scene.load_steps() if hasattr(scene, 'load_steps') else iter(())
+            self.preloading = (name, scene, steps, save_gen)
+    def advance(self, frame_ms):
+        # run as many fixed ticks as the elapsed time covers, then leave the
+        # remainder for the next frame
+        self.accumulator += frame_ms
+        ticks = 0
+        while self.accumulator >= self.dt_ms:
+            if ticks == MAX_CATCHUP_TICKS:
+                self.accumulator = 0.0
+                break
+            self.current_scene.update()
+            self.sim_time_ms += self.dt_ms
+            self.accumulator -= self.dt_ms
+            ticks += 1
+        self.alpha = self.accumulator / self.dt_ms
+        return ticks
+    def start_recording(self, path):
+        self.recorder = InputRecorder(path, self.rng.seed, self.sim_hz, self.screen.get_size(),
+                                      snapshot_saves(save_load.SAVE_DIR))
+    def quit(self):
+        if self.recorder is not None:
+            self.recorder.close()
+        save_load.session.close()
+        pygame.quit(); sys.exit()
+    def _redraw(self):
+        # Scenes with dirty_rendering = True provide dirty_rects(): the screen areas
+        # that changed since the last call. Only those get redrawn (draw() runs with
+        # a clip) and presented; None means the whole screen was redrawn.
+        scene = self.current_scene
+        full = self.full_redraw or profiler.enabled or not getattr(scene, 'dirty_rendering', False)
+        self.full_redraw = False
+        if full:
+            if hasattr(scene, 'dirty_rects'):
+                scene.dirty_rects()
+            scene.draw()
+            profiler.draw_overlay(self.screen)
+            return None
+        rects = scene.dirty_rects()
+        if rects:
+            self.screen.set_clip(rects[0].unionall(rects[1:]))
+            scene.draw()
+            self.screen.set_clip(None)
+        return rects
+    def frame(self, frame_ms, events):
+        # one frame of the main loop; returns False once the game was asked to quit
+        with profiler.section('events'):
+            if self.recorder is not None:
+                self.recorder.record(frame_ms, events, self.input)
+            for event in events:
                 if event.type == pygame.QUIT:
-                    pygame.quit(); sys.exit()
+                    return False
+                if event.type != pygame.MOUSEMOTION:
+                    # clicks and keys can change anything on screen
+                    self.full_redraw = True
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    profiler.toggle(); continue
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_F4 and profiler.enabled:
+                    profiler.export(); continue
                 self.current_scene.handle_event(event)
-            self.current_scene.update()
-            self.current_scene.draw()
-            pygame.display.flip()
-            self.clock.tick(60)
+        with profiler.section('update'):
+            self.advance(frame_ms)
+        with profiler.section('draw'):
+            rects = self._redraw()
+        with profiler.section('save_load.tick'):
+            save_load.session.tick()
+        with profiler.section('flip'):
+            self._present(rects)
+        self.idle = rects == []
+        self._preload_tick()
+        return True
+    def run(self):
+        while True:
+            frame_ms = self.clock.tick(IDLE_FPS if self.idle else self.fps_cap)
+            profiler.begin_frame()
+            with profiler.section('events'):
+                events = [self._map_event(e) for e in pygame.event.get()]
+                self.input.capture()
+            if not self.frame(frame_ms, events):
+                self.quit()
+    def run_replay(self, replay, realtime=False):
+        # feeds recorded frames through the loop as fast as they can be processed,
+        # with the recorded frame times so the simulation steps exactly as it did
+        self.input = ReplayInput()
+        for recorded in replay.frames:
+            if realtime:
+                self.clock.tick(self.fps_cap)
+            profiler.begin_frame()
+            pygame.event.get()  # live input is ignored, the recording drives the game
+            frame_ms, events = self.input.apply(recorded)
+            if not self.frame(frame_ms, events):
+                break
+        profiler.begin_frame()
+
+
+def replay_main(args):
+    replay = Replay(args.replay)
+    if not args.watch:
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    scratch = tempfile.mkdtemp(prefix='replay_saves_')
+    try:
+        replay.restore_saves(scratch)
+        save_load.use_save_dir(scratch)
+        game = Game(seed=replay.seed, render_size=replay.render_size, sim_hz=replay.sim_hz)
+        if not profiler.enabled:
+            profiler.toggle()
+        profiler.keep(len(replay.frames) + 1)
+        start = time.perf_counter()
+        game.run_replay(replay, realtime=args.watch)
+        wall_s = time.perf_counter() - start
+        save_load.session.close()
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    recorded_s = sum(f[0] for f in replay.frames) / 1000
+    frame = profiler.percentiles('frame') or {50: 0.0, 99: 0.0}
+    print(f'replayed {len(replay.frames)} frames ({recorded_s:.1f}s recorded) in {wall_s:.2f}s, '
+          f'{recorded_s / wall_s if wall_s else 0:.1f}x real time, '
+          f'frame p50 {frame[50]:.3f}ms p99 {frame[99]:.3f}ms')
+    print('profile written to', profiler.export(args.profile_name))
+    pygame.quit()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='The Last Base')
+    parser.add_argument('--seed', type=int, help='seed for the session RNG (random when omitted)')
+    parser.add_argument('--record', metavar='FILE', help='record input to FILE (gzip) for later replay')
+    parser.add_argument('--replay', metavar='FILE', help='replay a recording headless and unthrottled, then export a profile')
+    parser.add_argument('--watch', action='store_true', help='with --replay: show the window at recorded speed')
+    parser.add_argument('--profile-name', help='with --replay: basename of the exported profile')
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    Game().run()
+    args = parse_args()
+    if args.replay:
+        replay_main(args)
+    else:
+        game = Game(seed=args.seed)
+        if args.record:
+            game.start_recording(args.record)
+        game.run()
@@ -1,24 +1,36 @@
 import pygame
-import random
 import math
-from systems import save_load
+from systems import atlas, save_load, text_cache
+from systems.assets import assets
+from systems.chunks import CHUNK_SIZE, StructureLayer
+from systems.occupancy import TILE, OccupancyGrid
+from systems.profiler import profiler
+from systems.spatial_hash import SpatialHash
 
 class NPC:
+    IDLE_STEPS_PER_SEC = 1.2
+
     def __init__(self, name, role, pos):
         self.name = name
         self.role = role
         self.pos = pos
         self.color = (200, 200, 50)
         self.rect = pygame.Rect(pos[0], pos[1], 30, 30)
-    def move_idle(self):
-        if random.random() < 0.02:
-            self.pos[0] += random.choice([-1, 0, 1])
-            self.pos[1] += random.choice([-1, 0, 1])
+    def move_idle(self, dt, rng):
+        if rng.random() < self.IDLE_STEPS_PER_SEC * dt / 1000:
+            self.pos[0] += rng.choice([-1, 0, 1])
+            self.pos[1] += rng.choice([-1, 0, 1])
             self.rect.topleft = (self.pos[0], self.pos[1])
 
 class BaseScene:
     MAX_SLOTS = 18
     MAX_STACK = 100
+    FARM_GROW_MS = 10000
+    # structure size in tiles for new placements; anything not listed covers one
+    # tile. Saved structures keep their own rect, so older ones keep their size.
+    FOOTPRINTS = {"Workbench": (2, 1)}
+    # saved structures indexed per load step
+    LOAD_BATCH = 250
 
     def __init__(self, game):
         self.game = game
@@ -26,7 +38,8 @@ class BaseScene:
         self.clock = game.clock
         data = save_load.load_save()
         self.player_pos = list(data['base']['player_pos'])
-        self.player_speed = 4
+        self.prev_player_pos = list(self.player_pos)
+        self.player_speed = 240  # px per second
         self.attacking = False
         self.attack_timer = 0
         self.attack_applied = False
@@ -34,7 +47,7 @@ class BaseScene:
         self.last_attack_time = 0
         self.inventory_open = False
         self.inventory = self.load_inventory_stacks()
-        self.font = pygame.font.SysFont(None, 24)
+        self.font = text_cache.get_font(24)
         self.crafts = [
             ("Workbench", {"Wood":5, "Metal":2}),
             ("Wall", {"Wood":10}),
@@ -47,23 +60,15 @@ class BaseScene:
         self.drag_index = None
         self.drag_origin = None
         self.npcs = [NPC("Alex", "Builder", [200, 200]), NPC("Mia", "Medic", [300, 250])]
+        self.npc_rng = game.rng.stream('base.npcs')
         self.hover_npc = None
         self.dialog_open = False
         self.dialog_npc = None
         self.dialog_text = []
         self.dialog_index = 0
         self.pause_menu_open = False
-        self.item_icons = {
-            "Wood": self.make_icon((139,69,19)),
-            "Stone": self.make_icon((128,128,128)),
-            "Metal": self.make_icon((192,192,192)),
-            "Food": self.make_icon((34,139,34)),
-            "Workbench": self.make_icon((160,100,50)),
-            "Wall": self.make_icon((120,120,120)),
-            "Door": self.make_icon((100,80,60)),
-            "FarmPlot": self.make_icon((80,150,100)),
-        }
-        self.background = self.make_background()
+        self.atlas = atlas.get_atlas()
+        self.ground = self.make_ground()
         self.message = None
         self.split_open = False
         self.split_index = None
@@ -74,47 +79,90 @@ class BaseScene:
         self.split_confirm = pygame.Rect(360, 410, 100, 32)
         self.split_cancel = pygame.Rect(360, 450, 100, 32)
         self.trash_rect = pygame.Rect(470, 370, 80, 80)
+        # panel images, rebuilt on the next draw after being reset to None
+        self.inventory_surface = None
+        self.craft_surface = None
+        self.drag_shade = pygame.Surface((55, 55), pygame.SRCALPHA)
+        self.drag_shade.fill((0, 0, 0, 110))
         self.targets = [{"rect": pygame.Rect(520, 260, 30, 30), "hp": 3, "type":"dummy"}]
+        self.target_index = SpatialHash()
+        for t in self.targets: self.target_index.insert(t, t["rect"])
         self.build_mode = False
         self.build_catalog = ["Wall", "Door", "Workbench", "FarmPlot"]
         self.build_selected = 0
         self.build_ghost_color = (180, 180, 180)
+        # tile where the current build drag started
+        self.build_drag = None
         self.placed_structures = []
-        self._load_structures_from_save()
+        self.structure_layer = StructureLayer(self.ground)
+        # chunk -> farm plots in it; only chunks around the view grow, catching up on return
+        self.farms = {}
+        self.chunk_clock = {}
+        # chunk -> ms it has grown; farm position -> chunk growth at which its next Food is due
+        self.chunk_growth = {}
         self.farm_timers = {}
+        # chunk -> earliest due time among its farms, so idle chunks cost one comparison
+        self.farm_due = {}
+        self.occupancy = OccupancyGrid()
+        self.npc_index = SpatialHash()
+        # the saved structures are indexed by load_steps()
+        self.set_structures([])
+        # world position of the screen's top-left, following the player
+        self.camera = self._camera_for(self.player_pos)
+
+    def on_enter(self):
+        # the raid may have changed the inventory while this scene was cached
+        self.inventory = self.load_inventory_stacks()
+        self.inventory_surface = None
+        self.drag_index = None; self.drag_origin = None
 
-    def on_resize(self):
-        self.background = self.make_background()
+    def on_exit(self):
+        self._persist_base(); self.save_inventory()
 
-    def _load_structures_from_save(self):
-        data = save_load.load_save()
+    def load_steps(self):
+        # indexes the saved structures a batch at a time; the game runs every
+        # step right after construction, or one per frame when preloading
+        saved = save_load.load_save()['base']['placed_structures']
+        for i in range(0, len(saved), self.LOAD_BATCH):
+            for s in saved[i:i + self.LOAD_BATCH]:
+                r = s['rect']
+                rect = pygame.Rect(r['x'], r['y'], r.get('w', 40), r.get('h', 40))
+                self._add_structure({"type": s['type'], "rect": rect})
+            yield
+
+    def set_structures(self, structures):
         self.placed_structures = []
-        for s in data['base']['placed_structures']:
-            r = s['rect']
-            rect = pygame.Rect(r['x'], r['y'], r.get('w', 40), r.get('h', 40))
-            self.placed_structures.append({"type": s['type'], "rect": rect})
+        self.structure_layer.rebuild([])
+        self.farms = {}; self.farm_timers = {}; self.farm_due = {}
+        self.occupancy.rebuild([])
+        self.npc_index.clear()
+        for npc in self.npcs: self.npc_index.insert(npc, npc.rect)
+        for s in structures:
+            self._add_structure(s)
+
+    def _add_structure(self, structure):
+        self.placed_structures.append(structure)
+        self.structure_layer.add(structure)
+        self.occupancy.fill(structure['rect'], structure['type'])
+        if structure['type'] == 'FarmPlot': self._track_farm(structure)
+
+    def _track_farm(self, structure):
+        key = self.structure_layer.key_at(*structure['rect'].topleft)
+        self.farms.setdefault(key, []).append(structure)
+        due = self.chunk_growth.get(key, 0) + self.FARM_GROW_MS
+        self.farm_timers[structure['rect'].topleft] = due
+        self.farm_due[key] = min(self.farm_due.get(key, due), due)
 
     def _persist_base(self):
-        save_load.save_base_state(player_pos=self.player_pos, placed_structures=self.placed_structures)
+        # structures are journaled one by one as they are placed
+        save_load.save_base_state(player_pos=self.player_pos)
 
     def load_inventory_stacks(self):
-        items = save_load.load_save().get("inventory", [])
-        stacks = []
-        counts = {}
-        for it in items:
-            counts[it] = counts.get(it, 0) + 1
-        for it, qty in counts.items():
-            while qty > 0:
-                take = min(qty, self.MAX_STACK)
-                stacks.append({"item": it, "qty": take})
-                qty -= take
-        return stacks
+        return save_load.load_inventory()
 
     def save_inventory(self):
-        flat = []
-        for st in self.inventory:
-            flat.extend([st["item"]] * st["qty"])
-        save_load.save_inventory(flat)
+        self.inventory_surface = None
+        save_load.save_inventory(self.inventory)
 
     def add_item(self, item, amount=1):
         for st in self.inventory:
@@ -148,15 +196,18 @@ class BaseScene:
     def count_item(self, item):
         return sum(st["qty"] for st in self.inventory if st["item"] == item)
 
-    def make_icon(self, color):
-        surf = pygame.Surface((32, 32), pygame.SRCALPHA)
-        pygame.draw.rect(surf, color, (0,0,32,32), border_radius=6)
-        pygame.draw.rect(surf, (0,0,0,60), (0,0,32,32), 2, border_radius=6)
-        return surf
+    def make_ground(self):
+        # one chunk of ground, tiled under the world: assets/background/base_bg.png
+        # when it is a usable image, else the drawn grid
+        size = (CHUNK_SIZE, CHUNK_SIZE)
+        try:
+            return assets.image('background/base_bg.png', size)
+        except (pygame.error, OSError):
+            return assets.generated('base_grid', size, self.draw_grid)
 
-    def make_background(self):
-        w, h = self.screen.get_size()
-        bg = pygame.Surface((w, h))
+    def draw_grid(self, size):
+        w, h = size
+        bg = pygame.Surface((w, h)).convert()
         bg.fill((45, 55, 45))
         for x in range(0, w, 40):
             pygame.draw.line(bg, (50, 65, 50), (x,0), (x,h))
@@ -171,13 +222,14 @@ class BaseScene:
             rect = pygame.Rect(570, y_offset, 200, 40)
             self.craft_buttons.append((rect, name, req))
             y_offset += 60
+        self.craft_surface = None
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             # debounce toggles: ignore repeat
             is_repeat = getattr(event, 'repeat', False)
             if event.key == pygame.K_m and not self.pause_menu_open and not self.split_open:
-                self._persist_base(); self.save_inventory(); self.game.switch_scene("raid")
+                self.game.switch_scene("raid")
             if event.key == pygame.K_TAB and not is_repeat:
                 self.inventory_open = not self.inventory_open
             if event.key == pygame.K_ESCAPE and not is_repeat:
@@ -186,7 +238,7 @@ class BaseScene:
                 self.dialog_index += 1
                 if self.dialog_index >= len(self.dialog_text): self.dialog_open = False
             if event.key == pygame.K_f and not self.pause_menu_open and not is_repeat:
-                self.build_mode = not self.build_mode
+                self.build_mode = not self.build_mode; self.build_drag = None
             if event.key == pygame.K_q and self.build_mode and not is_repeat:
                 self.build_selected = (self.build_selected - 1) % len(self.build_catalog)
             if event.key == pygame.K_e and self.build_mode and not is_repeat:
@@ -196,7 +248,7 @@ class BaseScene:
                 return
             if event.button == 1 and not self.inventory_open and not self.dialog_open and not self.build_mode:
                 if self.hover_npc is None:
-                    now = pygame.time.get_ticks()
+                    now = self.game.sim_time_ms
                     if now - self.last_attack_time >= self.attack_cooldown:
                         self.attacking = True; self.attack_timer = 120; self.attack_applied = False; self.last_attack_time = now
             if event.button == 1 and self.hover_npc and not self.dialog_open and not self.inventory_open:
@@ -220,9 +272,11 @@ class BaseScene:
                             if self.can_craft(req): self.craft_item(name, req)
                             else: self.message = "not enough materials"
             if event.button == 1 and self.build_mode and not self.inventory_open and not self.dialog_open:
-                self.try_place_structure()
+                self.build_drag = self._tile_under_mouse()
         if event.type == pygame.MOUSEBUTTONUP:
             if event.button == 1:
+                if self.build_drag is not None:
+                    self.try_place_structures(self._drag_rects()); self.build_drag = None
                 if self.drag_index is not None and not self.split_open:
                     if self.trash_rect.collidepoint(event.pos):
                         del self.inventory[self.drag_index]; self.save_inventory()
@@ -274,113 +328,191 @@ class BaseScene:
             if name == build_type: return req
         return {}
 
-    def try_place_structure(self):
+    def _tile_under_mouse(self):
+        mx, my = self.world_mouse()
+        return mx // TILE, my // TILE
+
+    def _drag_rects(self):
+        # footprints from the drag start to the mouse: a row or column along the
+        # longer axis, or the whole rectangle while Shift is held
+        build_type = self.build_catalog[self.build_selected]
+        fw, fh = self.FOOTPRINTS.get(build_type, (1, 1))
+        (x0, y0), (x1, y1) = self.build_drag, self._tile_under_mouse()
+        keys = self.game.input.keys
+        if not (keys[pygame.K_LSHIFT] or keys[pygame.K_RSHIFT]):
+            if abs(x1 - x0) >= abs(y1 - y0): y1 = y0
+            else: x1 = x0
+        xs = range(x0, x1 + 1, fw) if x1 >= x0 else range(x0, x1 - 1, -fw)
+        ys = range(y0, y1 + 1, fh) if y1 >= y0 else range(y0, y1 - 1, -fh)
+        return [pygame.Rect(tx * TILE, ty * TILE, fw * TILE, fh * TILE) for ty in ys for tx in xs]
+
+    def try_place_structures(self, rects):
+        # places as many of rects as are free and affordable, paying and saving once
         build_type = self.build_catalog[self.build_selected]
         cost = self.get_build_cost(build_type)
         if not self.can_craft(cost): self.message = "not enough materials"; return
-        mx, my = pygame.mouse.get_pos()
-        gx = (mx // 40) * 40; gy = (my // 40) * 40
-        rect = pygame.Rect(gx, gy, 40, 40)
-        for s in self.placed_structures:
-            if rect.colliderect(s['rect']): self.message = "occupied"; return
-        for npc in self.npcs:
-            if rect.colliderect(npc.rect): self.message = "occupied"; return
-        self.consume_materials(cost)
-        self.placed_structures.append({"type": build_type, "rect": rect})
-        self.message = f"Placed {build_type}"; self._persist_base()
+        rects = [r for r in rects if self.occupancy.is_free(r) and not self.npc_index.query_rect(r)]
+        if not rects: self.message = "occupied"; return
+        affordable = min((self.count_item(item) // qty for item, qty in cost.items() if qty), default=len(rects))
+        rects = rects[:affordable]
+        self.consume_materials({item: qty * len(rects) for item, qty in cost.items()})
+        structures = [{"type": build_type, "rect": r} for r in rects]
+        for structure in structures:
+            self._add_structure(structure)
+        self.message = f"Placed {build_type}" if len(structures) == 1 else f"Placed {len(structures)} {build_type}"
+        save_load.add_structures(structures)
+
+    def _camera_for(self, player_pos):
+        w, h = self.screen.get_size()
+        return [int(player_pos[0]) + 20 - w // 2, int(player_pos[1]) + 20 - h // 2]
+
+    def view_rect(self):
+        return pygame.Rect(self.camera, self.screen.get_size())
+
+    def world_mouse(self):
+        mx, my = self.game.input.mouse_pos
+        return mx + self.camera[0], my + self.camera[1]
 
     def update(self):
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_a]: self.player_pos[0] -= self.player_speed
-        if keys[pygame.K_d]: self.player_pos[0] += self.player_speed
-        if keys[pygame.K_w]: self.player_pos[1] -= self.player_speed
-        if keys[pygame.K_s]: self.player_pos[1] += self.player_speed
-        for npc in self.npcs: npc.move_idle()
+        dt = self.game.dt_ms
+        keys = self.game.input.keys
+        self.prev_player_pos = list(self.player_pos)
+        step = self.player_speed * dt / 1000
+        if keys[pygame.K_a]: self.player_pos[0] -= step
+        if keys[pygame.K_d]: self.player_pos[0] += step
+        if keys[pygame.K_w]: self.player_pos[1] -= step
+        if keys[pygame.K_s]: self.player_pos[1] += step
+        self.camera = self._camera_for(self.player_pos)
+        for npc in self.npcs:
+            npc.move_idle(dt, self.npc_rng); self.npc_index.move(npc, npc.rect)
         if self.attacking:
-            dt = self.clock.get_time(); self.attack_timer -= dt
+            self.attack_timer -= dt
             if self.attack_timer <= 0: self.attacking = False; self.attack_timer = 0; self.attack_applied = False
         if self.attacking and not self.attack_applied:
             self.apply_attack_cone(); self.attack_applied = True
-        mouse_pos = pygame.mouse.get_pos(); self.hover_npc = None
+        if self.inventory_open:
+            hover = self.get_slot_under_mouse()
+            if hover != self.hover_item_index:
+                self.hover_item_index = hover; self.inventory_surface = None
+        mouse_pos = self.world_mouse(); self.hover_npc = None
         for npc in self.npcs:
             npc.rect.topleft = (npc.pos[0], npc.pos[1])
             if npc.rect.collidepoint(mouse_pos): self.hover_npc = npc
-        for idx, s in enumerate(self.placed_structures):
-            if s['type'] == 'FarmPlot':
-                t = self.farm_timers.get(idx, 0) + self.clock.get_time()
-                if t >= 10000:
-                    produced = self.add_item('Food', 1)
-                    if produced: self.message = "Farm produced Food"
-                    t = 0
-                self.farm_timers[idx] = t
+        self.update_farms()
+
+    def update_farms(self):
+        # chunks around the view grow every tick; a chunk coming back into range
+        # first catches up on the time it was away
+        now = self.game.sim_time_ms
+        view = self.view_rect().inflate(CHUNK_SIZE * 2, CHUNK_SIZE * 2)
+        for key in self.structure_layer.keys_in(view):
+            elapsed = now - self.chunk_clock.get(key, now - self.game.dt_ms)
+            self.chunk_clock[key] = now
+            if key not in self.farms: continue
+            grown = self.chunk_growth[key] = self.chunk_growth.get(key, 0) + elapsed
+            if grown < self.farm_due[key]: continue
+            produced = 0
+            for s in self.farms[key]:
+                pos = s['rect'].topleft
+                due = self.farm_timers[pos]
+                if grown >= due:
+                    n = int((grown - due) // self.FARM_GROW_MS) + 1
+                    produced += n
+                    self.farm_timers[pos] = due + n * self.FARM_GROW_MS
+            self.farm_due[key] = min(self.farm_timers[s['rect'].topleft] for s in self.farms[key])
+            if produced and self.add_item('Food', produced): self.message = "Farm produced Food"
 
+    @profiler.timed('BaseScene.apply_attack_cone')
     def apply_attack_cone(self):
         origin = pygame.Vector2(self.player_pos[0]+20, self.player_pos[1]+20)
-        mx,my = pygame.mouse.get_pos()
+        mx,my = self.world_mouse()
         dir_vec = pygame.Vector2(mx-origin.x, my-origin.y)
         angle = math.degrees(math.atan2(dir_vec.y, dir_vec.x))
         spread = 80; range_px = 60
-        for t in self.targets:
-            center = pygame.Vector2(t["rect"].center)
-            to_target = center - origin; dist = to_target.length()
-            if dist <= range_px:
-                ang = math.degrees(math.atan2(to_target.y, to_target.x))
-                if abs((ang - angle + 180) % 360 - 180) <= spread/2: t["hp"] -= 1
-        self.targets = [t for t in self.targets if t["hp"] > 0]
+        dead = False
+        for t in self.target_index.query_cone(origin, angle, spread, range_px):
+            t["hp"] -= 1
+            if t["hp"] <= 0: self.target_index.remove(t); dead = True
+        if dead: self.targets = [t for t in self.targets if t["hp"] > 0]
+
+    def slot_rect(self, i):
+        return pygame.Rect(60 + (i % 6) * 60, 90 + (i // 6) * 60, 55, 55)
 
     def get_slot_under_mouse(self):
-        mouse_pos = pygame.mouse.get_pos()
-        slot_width, slot_height = 60, 60; start_x, start_y = 60, 90
-        for i in range(self.MAX_SLOTS):
-            row = i // 6; col = i % 6
-            x = start_x + col * slot_width; y = start_y + row * slot_height
-            rect = pygame.Rect(x, y, slot_width-5, slot_height-5)
-            if rect.collidepoint(mouse_pos): return i
-        return None
+        mx, my = self.game.input.mouse_pos
+        col, row = (mx - 60) // 60, (my - 90) // 60
+        if not (0 <= col < 6 and row >= 0) or row * 6 + col >= self.MAX_SLOTS:
+            return None
+        i = row * 6 + col
+        return i if self.slot_rect(i).collidepoint(mx, my) else None
 
-    def draw_inventory(self):
-        # inventory panel
-        inv_rect = pygame.Rect(50, 50, 500, 400)
-        pygame.draw.rect(self.screen, (60, 60, 60), inv_rect)
-        slot_width, slot_height = 60, 60; start_x, start_y = 60, 90
+    def render_inventory_panel(self):
+        # inventory slots and trash at panel origin (50, 50)
+        surf = pygame.Surface((500, 400))
+        surf.fill((60, 60, 60))
+        blits = []
         for i in range(self.MAX_SLOTS):
-            row = i // 6; col = i % 6
-            x = start_x + col * slot_width; y = start_y + row * slot_height
-            rect = pygame.Rect(x, y, slot_width-5, slot_height-5)
-            pygame.draw.rect(self.screen, (100, 100, 100), rect)
+            rect = self.slot_rect(i).move(-50, -50)
+            pygame.draw.rect(surf, (130, 130, 130) if i == self.hover_item_index else (100, 100, 100), rect)
             if i < len(self.inventory):
-                st = self.inventory[i]; icon = self.item_icons.get(st["item"]) 
-                if icon: self.screen.blit(icon, (x+14, y+14))
-                qty_text = self.font.render(f"{st['qty']}x", True, (255,255,255))
-                self.screen.blit(qty_text, (x+30, y+40))
-        pygame.draw.rect(self.screen, (150, 0, 0), self.trash_rect)
-        self.screen.blit(self.font.render("Trash", True, (255,255,255)), (self.trash_rect.x+5, self.trash_rect.y+30))
-        # craft panel
-        craft_rect = pygame.Rect(560, 50, 220, 260)
-        pygame.draw.rect(self.screen, (80, 80, 80), craft_rect)
+                st = self.inventory[i]; icon = self.atlas.entry(st["item"], (rect.x+14, rect.y+14))
+                if icon: blits.append(icon)
+                blits.append((text_cache.render(self.font, f"{st['qty']}x", (255,255,255)), (rect.x+30, rect.y+40)))
+        surf.blits(blits, doreturn=False)
+        trash = self.trash_rect.move(-50, -50)
+        pygame.draw.rect(surf, (150, 0, 0), trash)
+        surf.blit(text_cache.render(self.font, "Trash", (255,255,255)), (trash.x+5, trash.y+30))
+        return surf
+
+    def render_craft_panel(self):
+        # recipe buttons at panel origin (560, 50)
+        surf = pygame.Surface((220, 260))
+        surf.fill((80, 80, 80))
         for rect, name, req in self.craft_buttons:
-            pygame.draw.rect(self.screen, (120,120,120), rect)
-            self.screen.blit(self.font.render(name, True, (255,255,255)), (rect.x+5, rect.y+5))
+            rect = rect.move(-560, -50)
+            pygame.draw.rect(surf, (120,120,120), rect)
+            surf.blit(text_cache.render(self.font, name, (255,255,255)), (rect.x+5, rect.y+5))
             req_txt = ', '.join([f"{k} x{v}" for k,v in req.items()])
-            self.screen.blit(self.font.render(req_txt, True, (200,200,200)), (rect.x+5, rect.y+20))
-        if self.message: self.screen.blit(self.font.render(self.message, True, (255,0,0)), (300, 60))
+            surf.blit(text_cache.render(self.font, req_txt, (200,200,200)), (rect.x+5, rect.y+20))
+        return surf
+
+    @profiler.timed('BaseScene.draw_inventory')
+    def draw_inventory(self):
+        if self.inventory_surface is None: self.inventory_surface = self.render_inventory_panel()
+        if self.craft_surface is None: self.craft_surface = self.render_craft_panel()
+        self.screen.blits(((self.inventory_surface, (50, 50)), (self.craft_surface, (560, 50))), doreturn=False)
+        if self.drag_index is not None and self.drag_index < len(self.inventory):
+            # drag feedback: dim the origin slot and carry the stack's icon with the mouse
+            self.screen.blit(self.drag_shade, self.slot_rect(self.drag_index))
+            mx, my = self.game.input.mouse_pos
+            self.atlas.draw(self.screen, [(self.inventory[self.drag_index]["item"], (mx-16, my-16))])
+        if self.message: self.screen.blit(text_cache.render(self.font, self.message, (255,0,0)), (300, 60))
 
     def draw_dialog(self):
         pygame.draw.rect(self.screen, (50, 50, 50), (150, 380, 500, 180))
         if self.dialog_text:
-            self.screen.blit(self.font.render(self.dialog_text[self.dialog_index], True, (255, 255, 255)), (170, 400))
-        self.screen.blit(self.font.render("SPACE folytatás", True, (200,200,200)), (500, 530))
+            self.screen.blit(text_cache.render(self.font, self.dialog_text[self.dialog_index], (255, 255, 255)), (170, 400))
+        self.screen.blit(text_cache.render(self.font, "SPACE folytatás", (200,200,200)), (500, 530))
+
+    def _draw_pos(self):
+        # player position interpolated between the last two simulation ticks
+        a = self.game.alpha
+        return (self.prev_player_pos[0] + (self.player_pos[0] - self.prev_player_pos[0]) * a,
+                self.prev_player_pos[1] + (self.player_pos[1] - self.prev_player_pos[1]) * a)
 
     def draw(self):
-        self.screen.blit(self.background, (0, 0))
-        rect = pygame.Rect(self.player_pos[0], self.player_pos[1], 40, 40)
-        pygame.draw.rect(self.screen, (0, 0, 255), rect)
-        for npc in self.npcs: pygame.draw.rect(self.screen, npc.color, npc.rect)
+        # the camera follows the interpolated player so scrolling stays smooth
+        pos = self._draw_pos()
+        cx, cy = self._camera_for(pos)
+        self.structure_layer.stream(pygame.Rect((cx, cy), self.screen.get_size()))
+        self.structure_layer.draw(self.screen, (cx, cy))
+        pygame.draw.rect(self.screen, (0, 0, 255), pygame.Rect(pos[0] - cx, pos[1] - cy, 40, 40))
+        for npc in self.npcs: pygame.draw.rect(self.screen, npc.color, npc.rect.move(-cx, -cy))
+        if self.build_drag is not None:
+            for r in self._drag_rects():
+                pygame.draw.rect(self.screen, self.build_ghost_color, r.move(-cx, -cy), 1)
         if self.hover_npc:
-            mx,my = pygame.mouse.get_pos()
-            self.screen.blit(self.font.render(f"{self.hover_npc.name} - {self.hover_npc.role}", True, (255,255,255)), (mx+10, my))
-        for s in self.placed_structures:
-            color = (120,120,120) if s['type']=="Wall" else (100,80,60) if s['type']=="Door" else (160,100,50) if s['type']=="Workbench" else (80,150,100)
-            pygame.draw.rect(self.screen, color, s['rect'])
+            mx,my = self.game.input.mouse_pos
+            self.screen.blit(text_cache.render(self.font, f"{self.hover_npc.name} - {self.hover_npc.role}", (255,255,255)), (mx+10, my))
         if self.inventory_open: self.draw_inventory()
         if self.dialog_open: self.draw_dialog()
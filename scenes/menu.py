@@ -1,16 +1,20 @@
 import pygame
-import os
 from ui.buttons import Button
 from ui.textbox import TextBox
-from systems import save_load
+from ui.dirty import collect_dirty
+from systems import save_load, text_cache
+from systems.assets import assets
 
 class MenuScene:
+    SLOTS_PER_PAGE = 3
+    dirty_rendering = True
+
     def __init__(self, game):
         self.game = game
         self.screen = game.screen
         self.clock = game.clock
-        self.font = pygame.font.SysFont(None, 72)
-        self.small = pygame.font.SysFont(None, 32)
+        self.font = text_cache.get_font(72)
+        self.small = text_cache.get_font(32)
         self.bg = self._load_bg()
         self.buttons = []
         self._build_main_buttons()
@@ -22,6 +26,15 @@ class MenuScene:
         self.newgame_selected_slot = None
         self.message = None
         self.overwrite_confirm = False
+        self.slot_page = 0
+        self.slot_page_count = 1
+        self.prev_btn = Button('<', (0, 0), (50, 40), self._prev_slot_page)
+        self.next_btn = Button('>', (0, 0), (50, 40), self._next_slot_page)
+
+    def on_enter(self):
+        self.newgame_open = False
+        self.overwrite_confirm = False
+        self.message = None
 
     def on_resize(self):
         # re-scale background and rebuild layout
@@ -31,19 +44,16 @@ class MenuScene:
             self._build_slot_buttons()
 
     def _load_bg(self):
-        root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        assets = os.path.join(root, 'assets')
-        path_user = os.path.join(assets, 'menu_bg.png')
-        path_ph = os.path.join(assets, 'menu_bg_placeholder.png')
-        img_path = path_user if os.path.exists(path_user) else path_ph
+        name = 'menu_bg.png' if assets.exists('menu_bg.png') else 'menu_bg_placeholder.png'
         try:
-            img = pygame.image.load(img_path).convert()
-            img = pygame.transform.smoothscale(img, self.screen.get_size())
-            return img
-        except Exception:
-            surf = pygame.Surface(self.screen.get_size())
-            surf.fill((20,25,20))
-            return surf
+            return assets.image(name, self.screen.get_size())
+        except (pygame.error, OSError):
+            return assets.generated('menu_bg_fallback', self.screen.get_size(), self._fallback_bg)
+
+    def _fallback_bg(self, size):
+        surf = pygame.Surface(size).convert()
+        surf.fill((20,25,20))
+        return surf
 
     def _build_main_buttons(self):
         screen_w, screen_h = self.screen.get_size()
@@ -77,6 +87,7 @@ class MenuScene:
         self.newgame_open = True
         self.message = None
         self.overwrite_confirm = False
+        self.slot_page = 0
         self._build_slot_buttons()
         self.name_box.text = ''
         self.newgame_selected_slot = None
@@ -89,14 +100,34 @@ class MenuScene:
         self.newgame_open = False
         self.overwrite_confirm = False
 
+    def _prev_slot_page(self):
+        if self.slot_page > 0:
+            self.slot_page -= 1
+            self._build_slot_buttons()
+
+    def _next_slot_page(self):
+        if self.slot_page < self.slot_page_count - 1:
+            self.slot_page += 1
+            self._build_slot_buttons()
+
     def _build_slot_buttons(self):
         self.slot_buttons = []
-        slots = save_load.list_slots()
+        per_page = self.SLOTS_PER_PAGE
+        # the list always ends with one free slot to start a new save in
+        free = save_load.next_free_slot()
+        extra = 0 if save_load.get_slot(free) else 1
+        total = save_load.slot_count() + extra
+        self.slot_page_count = max(1, (total + per_page - 1) // per_page)
+        self.slot_page = min(self.slot_page, self.slot_page_count - 1)
+        slots, _ = save_load.list_slots_page(self.slot_page, per_page)
+        if extra and len(slots) < per_page and self.slot_page == self.slot_page_count - 1:
+            slots.append({'index': free, 'name': '', 'exists': False, 'last_played': None})
         screen_w, screen_h = self.screen.get_size()
         panel_w, panel_h = 600, 420
         panel_x = (screen_w - panel_w)//2
         panel_y = (screen_h - panel_h)//2
         start_y = panel_y + 80
+        slot_spacing = 56
         for idx, s in enumerate(slots, start=1):
             y = start_y + (idx-1)*slot_spacing
             name = s['name'] if s['name'] else 'Empty'
@@ -109,6 +140,8 @@ class MenuScene:
         self.name_box.rect.size = (panel_w-40, 50)
         self.create_btn.rect.topleft = (panel_x+20, panel_y+panel_h-60)
         self.cancel_btn.rect.topleft = (panel_x+220, panel_y+panel_h-60)
+        self.prev_btn.rect.topleft = (panel_x+panel_w-130, panel_y+panel_h-170)
+        self.next_btn.rect.topleft = (panel_x+panel_w-70, panel_y+panel_h-170)
         self._panel_geo = (panel_x, panel_y, panel_w, panel_h)
 
     def _select_slot(self, slot_index):
@@ -148,6 +181,8 @@ class MenuScene:
         if self.newgame_open:
             for b in self.slot_buttons:
                 b.handle_event(event)
+            self.prev_btn.handle_event(event)
+            self.next_btn.handle_event(event)
             self.create_btn.handle_event(event)
             self.cancel_btn.handle_event(event)
             self.name_box.handle_event(event)
@@ -165,37 +200,47 @@ class MenuScene:
 
     def update(self):
         if self.newgame_open:
-            dt = self.clock.get_time()
-            self.name_box.update(dt)
+            self.name_box.update(self.game.dt_ms)
+
+    def dirty_rects(self):
+        if not self.newgame_open:
+            return collect_dirty(self.buttons)
+        widgets = self.slot_buttons + [self.name_box, self.create_btn, self.cancel_btn]
+        if self.slot_page_count > 1:
+            widgets += [self.prev_btn, self.next_btn]
+        return collect_dirty(widgets)
 
     def draw(self):
         self.screen.blit(self.bg, (0,0))
         screen_w, screen_h = self.screen.get_size()
-        title = self.font.render('The Last Base', True, (230,230,230))
+        title = text_cache.render(self.font, 'The Last Base', (230,230,230))
         self.screen.blit(title, ((screen_w - title.get_width())//2, 100))
         if self.newgame_open:
             panel_x, panel_y, panel_w, panel_h = self._panel_geo
             pygame.draw.rect(self.screen, (25,25,25), (panel_x, panel_y, panel_w, panel_h), border_radius=12)
             pygame.draw.rect(self.screen, (80,80,80), (panel_x, panel_y, panel_w, panel_h), 2, border_radius=12)
-            cap = self.small.render('NEW GAME — válassz slotot és adj nevet', True, (200,200,200))
+            cap = text_cache.render(self.small, 'NEW GAME — válassz slotot és adj nevet', (200,200,200))
             self.screen.blit(cap, (panel_x+20, panel_y+20))
             for b in self.slot_buttons:
                 b.draw(self.screen)
+            if self.slot_page_count > 1:
+                self.prev_btn.draw(self.screen)
+                self.next_btn.draw(self.screen)
             self.name_box.draw(self.screen)
             self.create_btn.draw(self.screen)
             self.cancel_btn.draw(self.screen)
             if self.newgame_selected_slot:
-                sel = self.small.render(f'Selected: Slot {self.newgame_selected_slot}', True, (220,220,220))
+                sel = text_cache.render(self.small, f'Selected: Slot {self.newgame_selected_slot}', (220,220,220))
                 self.screen.blit(sel, (panel_x+20, panel_y+panel_h-160))
             if self.message:
-                self.screen.blit(self.small.render(self.message, True, (255,80,80)), (panel_x+20, panel_y+panel_h-70))
+                self.screen.blit(text_cache.render(self.small, self.message, (255,80,80)), (panel_x+20, panel_y+panel_h-70))
             if self.overwrite_confirm:
                 yes_rect = pygame.Rect(panel_x+panel_w-220, panel_y+20, 90, 40)
                 no_rect = pygame.Rect(panel_x+panel_w-120, panel_y+20, 90, 40)
                 pygame.draw.rect(self.screen, (80,160,80), yes_rect)
                 pygame.draw.rect(self.screen, (160,80,80), no_rect)
-                self.screen.blit(self.small.render('YES', True, (255,255,255)), (yes_rect.x+20, yes_rect.y+8))
-                self.screen.blit(self.small.render('NO', True, (255,255,255)), (no_rect.x+28, no_rect.y+8))
+                self.screen.blit(text_cache.render(self.small, 'YES', (255,255,255)), (yes_rect.x+20, yes_rect.y+8))
+                self.screen.blit(text_cache.render(self.small, 'NO', (255,255,255)), (no_rect.x+28, no_rect.y+8))
         else:
             for b in self.buttons:
                 b.draw(self.screen)
@@ -1,49 +1,94 @@
-import pygame, random, math
-from systems import save_load
+import pygame, math
+import numpy as np
+from systems import atlas, save_load, text_cache
+from systems.flowfield import FlowField
+from systems.horde import ENEMY_SIZE, Horde
+from systems.noise_field import NoiseField
+from systems.profiler import profiler
+from systems.spatial_hash import SpatialHash
 
 class RaidScene:
     MAX_SLOTS = 18
     MAX_STACK = 100
+    MOVE_NOISE_PER_SEC = 6
+    # area the horde paths over; outside it enemies walk straight at the player
+    FIELD_BOUNDS = pygame.Rect(-800, -800, 2880, 2320)
+    FIELD_CELL = 40
+    NOISE_CELL = 80
+    # while it is this loud around the player or any enemy, the horde grows
+    # every ESCALATION_MS, up to MAX_HORDE enemies
+    ESCALATION_INTENSITY = 3.0
+    ESCALATION_MS = 8000
+    # map-wide noise total at which the HUD bar is full; totals are capped here
+    NOISE_MAX = 200
+    MAX_HORDE = 400
 
     def __init__(self, game):
         self.horde_level = 0
         self.game = game
         self.screen = game.screen
         self.clock = game.clock
-        self.font = pygame.font.SysFont(None, 24)
+        self.font = text_cache.get_font(24)
+        self.atlas = atlas.get_atlas()
+        # the enemy sprite has no transparent pixels; an opaque copy blits about
+        # three times faster than the alpha sheet, which adds up over a horde
+        self.enemy_sprite = self.atlas.sheet.subsurface(self.atlas.rects["enemy"]).convert()
+        self.loot_rng = game.rng.stream('raid.loot')
+        self.enemy_rng = game.rng.stream('raid.enemies')
+        self.weather_rng = game.rng.stream('raid.weather')
         self.player_pos = [400, 300]
-        self.player_speed = 4
+        self.prev_player_pos = [400, 300]
+        self.player_speed = 240  # px per second
         self.attacking = False
         self.attack_timer = 0
         self.attack_applied = False
         self.attack_cooldown = 250
         self.last_attack_time = 0
         self.loot_items = []
+        self.horde = Horde()
+        # the raid map has no obstacles yet, so every cell is walkable
+        b = self.FIELD_BOUNDS
+        self.flow = FlowField(np.ones((b.height // self.FIELD_CELL, b.width // self.FIELD_CELL), bool),
+                              self.FIELD_CELL, b.topleft)
+        self.loot_index = SpatialHash()
+        self.noise_field = NoiseField((b.height // self.NOISE_CELL, b.width // self.NOISE_CELL), self.NOISE_CELL, b.topleft)
+        # total noise on the map, for the HUD bar and the save
+        self.noise = 0
+        # loudest noise around the player or the horde, for escalation
+        self.heard = 0.0
+        self.last_escalation = 0
+        self.weather = 'clear'
+        self.weather_timer = 0
+        self.weather_cycle_ms = 20000
+        self.message = None
+        self.pause_menu_open = False
+
+    def on_enter(self):
+        # every visit is a fresh raid; the cached instance only saves the setup
+        self.player_pos = [400, 300]
+        self.prev_player_pos = [400, 300]
+        self.attacking = False
+        self.attack_timer = 0
+        self.horde_level = 0
         self.spawn_loot()
-        self.enemies = []
         self.spawn_enemies()
         raid_data = save_load.load_save()['raid']
+        # the saved total has no position, so it comes back as a faint background
         self.noise = raid_data.get('noise', 0)
-        self.noise_threshold = 100
-        self.horde_level = 0
+        self.noise_field.clear()
+        self.noise_field.spread(self.noise)
+        self.heard = 0.0
+        self.last_escalation = self.game.sim_time_ms
         self.weather = raid_data.get('weather', 'clear')
         self.weather_timer = 0
-        self.weather_cycle_ms = 20000
         self.message = None
         self.pause_menu_open = False
 
+    def on_exit(self):
+        save_load.save_raid_state(noise=self.noise, weather=self.weather)
+
     def load_inventory_stacks(self):
-        items = save_load.load_save().get("inventory", [])
-        stacks = []
-        counts = {}
-        for it in items:
-            counts[it] = counts.get(it, 0) + 1
-        for it, qty in counts.items():
-            while qty > 0:
-                take = min(qty, self.MAX_STACK)
-                stacks.append({"item": it, "qty": take})
-                qty -= take
-        return stacks
+        return save_load.load_inventory()
 
     def add_item(self, item, amount=1):
         stacks = self.load_inventory_stacks()
@@ -58,120 +103,167 @@ class RaidScene:
             take = min(amount, self.MAX_STACK)
             stacks.append({"item": item, "qty": take})
             amount -= take
-        flat = []
-        for st in stacks:
-            flat.extend([st["item"]]*st["qty"])
-        save_load.save_inventory(flat)
+        save_load.save_inventory(stacks)
         return amount==0
 
     def spawn_loot(self):
         items = ["Wood", "Stone", "Metal", "Food"]
         self.loot_items.clear()
+        rng = self.loot_rng
         for _ in range(6):
-            x = random.randint(100, 700)
-            y = random.randint(100, 500)
-            item = random.choice(items)
+            x = rng.randint(100, 700)
+            y = rng.randint(100, 500)
+            item = rng.choice(items)
             self.loot_items.append({"pos": [x, y], "item": item})
+        self.loot_index.clear()
+        for loot in self.loot_items:
+            self.loot_index.insert(loot, pygame.Rect(loot["pos"], (1, 1)))
 
     def spawn_enemies(self):
-        self.enemies.clear()
         base_count = 4 + self.horde_level * 2
+        rng = self.enemy_rng
+        xs, ys = [], []
         for _ in range(base_count):
-            x = random.randint(100, 700)
-            y = random.randint(100, 500)
-            self.enemies.append({"rect": pygame.Rect(x, y, 30, 30), "hp": 2})
+            xs.append(rng.randint(100, 700))
+            ys.append(rng.randint(100, 500))
+        self.horde.clear()
+        self.horde.spawn(xs, ys, hp=2)
 
+    @profiler.timed('RaidScene.apply_attack_cone')
     def apply_attack_cone(self):
         origin = pygame.Vector2(self.player_pos[0]+20, self.player_pos[1]+20)
-        mx,my = pygame.mouse.get_pos()
+        mx,my = self.game.input.mouse_pos
         dir_vec = pygame.Vector2(mx-origin.x, my-origin.y)
         angle = math.degrees(math.atan2(dir_vec.y, dir_vec.x))
         spread = 80
         range_px = 60
-        for e in self.enemies:
-            center = pygame.Vector2(e["rect"].center)
-            to_target = center - origin
-            dist = to_target.length()
-            if dist <= range_px:
-                ang = math.degrees(math.atan2(to_target.y, to_target.x))
-                if abs((ang - angle + 180) % 360 - 180) <= spread/2:
-                    e["hp"] -= 1
-        self.enemies = [e for e in self.enemies if e["hp"]>0]
+        self.horde.damage(self.horde.cone_hits(origin, angle, spread, range_px))
+        self.horde.cull()
 
     def _update_weather(self, dt):
         self.weather_timer += dt
         if self.weather_timer >= self.weather_cycle_ms:
             self.weather_timer = 0
-            import random
-            self.weather = random.choice(['clear','rain','fog'])
-        if self.weather == 'rain': self.player_speed = 3
-        elif self.weather == 'fog': self.player_speed = 4
-        else: self.player_speed = 4
+            self.weather = self.weather_rng.choice(['clear','rain','fog'])
+        if self.weather == 'rain': self.player_speed = 180
+        elif self.weather == 'fog': self.player_speed = 240
+        else: self.player_speed = 240
         save_load.save_raid_state(weather=self.weather)
 
     def _add_noise(self, amount):
-        self.noise = max(0, min(200, self.noise + amount))
-        if self.noise >= self.noise_threshold:
-            self.horde_level = min(5, self.horde_level + 1)
-            self.spawn_enemies()
-            self.noise = int(self.noise_threshold * 0.7)
+        self.noise_field.deposit(self.player_pos[0]+20, self.player_pos[1]+20, amount)
+
+    def _noise_tick(self):
+        self.noise = min(self.NOISE_MAX, self.noise_field.total())
         save_load.save_raid_state(noise=self.noise)
+        # noise far from everyone neither draws the horde nor grows it
+        n = self.horde.count
+        listeners = np.vstack([[(self.player_pos[0]+20, self.player_pos[1]+20)], self.horde.pos[:n] + ENEMY_SIZE / 2])
+        self.heard = float(self.noise_field.sample(listeners).max())
+        now = self.game.sim_time_ms
+        if self.heard >= self.ESCALATION_INTENSITY and now - self.last_escalation >= self.ESCALATION_MS:
+            self.last_escalation = now
+            self.horde_level = min(5, self.horde_level + 1)
+            self.grow_horde(2 + self.horde_level)
+
+    def grow_horde(self, count):
+        # newcomers arrive from out of sight around the loudest spot on the map
+        count = min(count, self.MAX_HORDE - len(self.horde))
+        if count <= 0: return
+        cx, cy = self.noise_field.loudest()
+        rng = self.enemy_rng
+        xs, ys = [], []
+        for _ in range(count):
+            angle = rng.uniform(0, 2 * math.pi); r = rng.uniform(350, 450)
+            xs.append(cx + math.cos(angle) * r - 15)
+            ys.append(cy + math.sin(angle) * r - 15)
+        self.horde.spawn(xs, ys, hp=2)
 
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_b: self.game.switch_scene("base")
             if event.key == pygame.K_ESCAPE: self.pause_menu_open = not self.pause_menu_open
             if event.key == pygame.K_e:
-                for loot in list(self.loot_items):
+                px, py = int(self.player_pos[0]), int(self.player_pos[1])
+                for loot in self.loot_index.query_rect((px-50, py-50, 101, 101)):
                     if abs(self.player_pos[0]-loot["pos"][0])<50 and abs(self.player_pos[1]-loot["pos"][1])<50:
-                        if self.add_item(loot['item'], 1): self.loot_items.remove(loot); self._add_noise(1)
+                        if self.add_item(loot['item'], 1):
+                            self.loot_items.remove(loot); self.loot_index.remove(loot); self._add_noise(1)
                         else: self.message = "not enough space"
         if event.type == pygame.MOUSEBUTTONDOWN:
             if self.pause_menu_open: return
             if event.button == 1:
-                now = pygame.time.get_ticks()
+                now = self.game.sim_time_ms
                 if now - self.last_attack_time >= self.attack_cooldown:
                     self.attacking = True; self.attack_timer = 120; self.attack_applied = False; self.last_attack_time = now; self._add_noise(8)
 
     def update(self):
+        dt = self.game.dt_ms
+        self.prev_player_pos = list(self.player_pos)
         if not self.pause_menu_open:
-            keys = pygame.key.get_pressed(); moved = False
-            if keys[pygame.K_a]: self.player_pos[0] -= self.player_speed; moved = True
-            if keys[pygame.K_d]: self.player_pos[0] += self.player_speed; moved = True
-            if keys[pygame.K_w]: self.player_pos[1] -= self.player_speed; moved = True
-            if keys[pygame.K_s]: self.player_pos[1] += self.player_speed; moved = True
-            if moved: self._add_noise(0.1)
+            keys = self.game.input.keys; moved = False
+            step = self.player_speed * dt / 1000
+            if keys[pygame.K_a]: self.player_pos[0] -= step; moved = True
+            if keys[pygame.K_d]: self.player_pos[0] += step; moved = True
+            if keys[pygame.K_w]: self.player_pos[1] -= step; moved = True
+            if keys[pygame.K_s]: self.player_pos[1] += step; moved = True
+            if moved: self._add_noise(self.MOVE_NOISE_PER_SEC * dt / 1000)
+            target = (self.player_pos[0]+20, self.player_pos[1]+20)
+            self.flow.set_goal(*target)
+            self.horde.update(dt, target, self.flow, self.noise_field)
+            if self.noise_field.update(dt): self._noise_tick()
         if self.attacking:
-            dt = self.clock.get_time(); self.attack_timer -= dt
+            self.attack_timer -= dt
             if self.attack_timer <= 0: self.attacking = False; self.attack_timer = 0; self.attack_applied = False
         if self.attacking and not self.attack_applied:
             self.apply_attack_cone(); self.attack_applied = True
-        self._update_weather(self.clock.get_time())
+        self._update_weather(dt)
+
+    def _draw_pos(self):
+        # player position interpolated between the last two simulation ticks
+        a = self.game.alpha
+        return (self.prev_player_pos[0] + (self.player_pos[0] - self.prev_player_pos[0]) * a,
+                self.prev_player_pos[1] + (self.player_pos[1] - self.prev_player_pos[1]) * a)
 
     def draw(self):
         if self.weather == 'clear': self.screen.fill((200, 100, 50))
         elif self.weather == 'rain': self.screen.fill((120, 120, 150))
         else: self.screen.fill((150, 150, 150))
-        rect = pygame.Rect(self.player_pos[0], self.player_pos[1], 40, 40)
+        px, py = self._draw_pos()
+        rect = pygame.Rect(px, py, 40, 40)
         pygame.draw.rect(self.screen, (0, 0, 255), rect)
         if self.attacking:
-            origin = (self.player_pos[0]+20, self.player_pos[1]+20)
-            mx,my = pygame.mouse.get_pos()
+            origin = (px+20, py+20)
+            mx,my = self.game.input.mouse_pos
             angle_rad = math.atan2(my-origin[1], mx-origin[0])
             spread = math.radians(80); range_px = 60
             p1 = (origin[0] + math.cos(angle_rad-spread/2)*range_px, origin[1] + math.sin(angle_rad-spread/2)*range_px)
             p2 = (origin[0] + math.cos(angle_rad+spread/2)*range_px, origin[1] + math.sin(angle_rad+spread/2)*range_px)
             pygame.draw.polygon(self.screen, (255,0,0), [origin, p1, p2], 1)
-        for e in self.enemies:
-            pygame.draw.rect(self.screen, (50,200,50), e["rect"])
-            self.screen.blit(self.font.render(f"HP:{e['hp']}", True, (255,255,255)), (e['rect'].x, e['rect'].y-18))
+        # enemies and loot go out as one blits() batch of sprites and cached labels;
+        # only enemies on screen (or with their label on screen) are visited, and
+        # only damaged ones carry an HP label
+        sheet = self.atlas.sheet
+        loot_area = self.atlas.rects["loot"]
+        positions = self.horde.draw_positions(self.game.alpha)
+        visible = self.horde.visible(positions, self.screen.get_rect(), 20)
+        sprite = self.enemy_sprite
+        blits = [(sprite, p) for p in positions[visible].tolist()]
+        hurt = visible[self.horde.hp[visible] < self.horde.max_hp[visible]]
+        labels = {}
+        for (x, y), hp in zip(positions[hurt].tolist(), self.horde.hp[hurt].tolist()):
+            label = labels.get(hp)
+            if label is None: label = labels[hp] = text_cache.render(self.font, f"HP:{hp}", (255,255,255))
+            blits.append((label, (x, y-18)))
         for loot in self.loot_items:
-            pygame.draw.rect(self.screen, (150, 0, 0), (*loot["pos"], 30, 30))
-            self.screen.blit(self.font.render(loot["item"], True, (255,255,255)), (loot["pos"][0], loot["pos"][1]-20))
+            x, y = loot["pos"]
+            blits.append((sheet, (x, y), loot_area))
+            blits.append((text_cache.render(self.font, loot["item"], (255,255,255)), (x, y-20)))
+        self.screen.blits(blits, doreturn=False)
         pygame.draw.rect(self.screen, (30,30,30), (740, 40, 20, 200))
-        h = int(min(1.0, self.noise / self.noise_threshold) * 200)
+        h = int(min(1.0, self.noise / self.NOISE_MAX) * 200)
         pygame.draw.rect(self.screen, (200,40,40), (740, 240-h, 20, h))
-        self.screen.blit(self.font.render("NOISE", True, (255,255,255)), (710, 20))
-        self.screen.blit(self.font.render(f"{int(self.noise)}/{self.noise_threshold}", True, (255,255,255)), (690, 250))
-        self.screen.blit(self.font.render(f"Weather: {self.weather}", True, (255,255,255)), (20, 20))
-        if self.message: self.screen.blit(self.font.render(self.message, True, (255,0,0)), (320, 40))
+        self.screen.blit(text_cache.render(self.font, "NOISE", (255,255,255)), (710, 20))
+        self.screen.blit(text_cache.render(self.font, f"{int(self.noise)}/{self.NOISE_MAX}", (255,255,255)), (690, 250))
+        self.screen.blit(text_cache.render(self.font, f"Weather: {self.weather}", (255,255,255)), (20, 20))
+        if self.message: self.screen.blit(text_cache.render(self.font, self.message, (255,0,0)), (320, 40))
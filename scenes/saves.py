@@ -1,24 +1,55 @@
 import pygame
-from systems import save_load
+from systems import save_load, text_cache
+from systems import slot_preview
 from ui.buttons import Button
+from ui.dirty import collect_dirty
 
 class SavesScene:
+    ROW_HEIGHT = 80
+    dirty_rendering = True
+
     def __init__(self, game):
         self.game = game
         self.screen = game.screen
         self.clock = game.clock
-        self.font = pygame.font.SysFont(None, 48)
-        self.small = pygame.font.SysFont(None, 28)
+        self.font = text_cache.get_font(48)
+        self.small = text_cache.get_font(28)
+        self.tiny = text_cache.get_font(22)
         self.buttons = []
+        self.rows = []
+        self.page = 0
+        self.page_count = 1
+        # slots whose preview hadn't arrived at the last draw
+        self.pending_previews = set()
+        self.dirty_regions = []
+
+    def on_enter(self):
         self._refresh()
 
+    def _rows_per_page(self):
+        # rows between the hint line and the pager at the bottom
+        screen_h = self.screen.get_height()
+        return max(1, (screen_h - 200 - 140) // self.ROW_HEIGHT)
+
     def _refresh(self):
+        # only the rows of the current page get buttons; other slots are never built
         self.buttons = []
-        slots = save_load.list_slots()
+        self.rows = []
+        self.pending_previews = set()
+        per_page = self._rows_per_page()
+        slots, total = save_load.list_slots_page(self.page, per_page, order='last_played')
+        self.page_count = max(1, (total + per_page - 1) // per_page)
+        if self.page >= self.page_count:
+            self.page = self.page_count - 1
+            slots, total = save_load.list_slots_page(self.page, per_page, order='last_played')
         screen_w, screen_h = self.screen.get_size()
-        start_y = screen_h//2 - 140
-        for idx, s in enumerate(slots, start=1):
-            y = start_y + (idx-1)*80
+        start_y = 200
+        for idx, s in enumerate(slots):
+            y = start_y + idx*self.ROW_HEIGHT
+            self.rows.append((s, y))
+            if s['exists']:
+                save_load.request_preview(s['index'])
+                self.pending_previews.add(s['index'])
             name = s['name'] if s['name'] else 'Empty'
             txt = f"Slot {s['index']}: {name}"
             def make_cb(i=s['index']):
@@ -27,7 +58,23 @@ class SavesScene:
             def make_del_cb(i=s['index']):
                 return lambda: self._delete_slot(i)
             self.buttons.append(Button('Delete', (screen_w//2 + 100, y), (120, 50), make_del_cb()))
-        self.buttons.append(Button('Back', (screen_w//2 - 160, start_y + 3*80 + 40), (200, 50), self._back))
+        pager_y = screen_h - 120
+        self.buttons.append(Button('<', (screen_w//2 - 220, pager_y), (60, 50), self._prev_page))
+        self.buttons.append(Button('>', (screen_w//2 + 160, pager_y), (60, 50), self._next_page))
+        self.buttons.append(Button('Back', (screen_w//2 - 100, pager_y), (200, 50), self._back))
+
+    def on_resize(self):
+        self._refresh()
+
+    def _prev_page(self):
+        if self.page > 0:
+            self.page -= 1
+            self._refresh()
+
+    def _next_page(self):
+        if self.page < self.page_count - 1:
+            self.page += 1
+            self._refresh()
 
     def _start_slot(self, slot_index):
         ok = save_load.set_active_slot(slot_index)
@@ -45,17 +92,50 @@ class SavesScene:
         self.game.switch_scene('menu')
 
     def handle_event(self, event):
+        if event.type == pygame.MOUSEWHEEL:
+            if event.y > 0: self._prev_page()
+            elif event.y < 0: self._next_page()
+            return
         for b in self.buttons:
             b.handle_event(event)
 
     def update(self):
-        pass
+        for s, y in self.rows:
+            if s['index'] in self.pending_previews and save_load.get_preview(s['index']) is not None:
+                self.pending_previews.discard(s['index'])
+                self.dirty_regions.append(pygame.Rect(0, y - 5, self.screen.get_width(), self.ROW_HEIGHT))
+
+    def dirty_rects(self):
+        rects, self.dirty_regions = self.dirty_regions + collect_dirty(self.buttons), []
+        return rects
+
+    def _draw_previews(self):
+        # previews arrive from a worker thread; draw placeholders until then
+        screen_w = self.screen.get_width()
+        tw, th = slot_preview.THUMB_SIZE
+        for s, y in self.rows:
+            thumb_rect = pygame.Rect(screen_w//2 - 230 - tw, y + 25 - th//2, tw, th)
+            preview = save_load.get_preview(s['index']) if s['exists'] else (None, None)
+            summary, thumb = preview if preview else (None, None)
+            if thumb is not None:
+                self.screen.blit(thumb, thumb_rect)
+            else:
+                pygame.draw.rect(self.screen, (40, 46, 40), thumb_rect)
+                if preview is None:
+                    self.screen.blit(text_cache.render(self.small, '...', (120,120,120)), (thumb_rect.x + tw//2 - 10, thumb_rect.y + th//2 - 10))
+            pygame.draw.rect(self.screen, (30, 30, 30), thumb_rect, 1)
+            if summary:
+                txt = f"{summary['item_total']} items, {summary['structures']} structures, noise {summary['noise']}, {summary['weather']}"
+                self.screen.blit(text_cache.render(self.tiny, txt, (160,160,160)), (screen_w//2 - 210, y + 54))
 
     def draw(self):
         self.screen.fill((18, 22, 18))
-        title = self.font.render('Saves', True, (230,230,230))
+        title = text_cache.render(self.font, 'Saves', (230,230,230))
         self.screen.blit(title, ((self.screen.get_width()-title.get_width())//2, 100))
-        hint = self.small.render('Click slot to load or Delete to remove.', True, (180,180,180))
+        hint = text_cache.render(self.small, 'Click slot to load or Delete to remove.', (180,180,180))
         self.screen.blit(hint, ((self.screen.get_width()-hint.get_width())//2, 150))
         for b in self.buttons:
             b.draw(self.screen)
+        self._draw_previews()
+        pager = text_cache.render(self.small, f'{self.page + 1}/{self.page_count}', (180,180,180))
+        self.screen.blit(pager, ((self.screen.get_width()-pager.get_width())//2, self.screen.get_height() - 60))
@@ -1,14 +1,21 @@
 import pygame
+from systems import text_cache
+from systems.config import RENDER_SCALES, RESOLUTIONS, load_config, save_config
 from ui.buttons import Button
+from ui.dirty import collect_dirty
+from ui.option_cycle import OptionCycle
 
 class SettingsScene:
+    dirty_rendering = True
+
     def __init__(self, game):
         self.game = game
         self.screen = game.screen
         self.clock = game.clock
-        self.font = pygame.font.SysFont(None, 64)
-        self.small = pygame.font.SysFont(None, 32)
+        self.font = text_cache.get_font(64)
+        self.small = text_cache.get_font(32)
         self.buttons = []
+        self.options = []
         self._build_ui()
 
     def _build_ui(self):
@@ -20,6 +27,30 @@ class SettingsScene:
             Button('Toggle Fullscreen', (cx, start_y), (btn_w, btn_h), self._toggle_fullscreen),
             Button('Back', (cx, start_y + 100), (btn_w, btn_h), self._back)
         ]
+        cfg = load_config()
+        res_labels = [f'{w}x{h}' for w, h in RESOLUTIONS]
+        cur_res = f"{cfg['resolution'][0]}x{cfg['resolution'][1]}"
+        scale_labels = [f'{int(s * 100)}%' for s in RENDER_SCALES]
+        cur_scale = min(range(len(RENDER_SCALES)), key=lambda i: abs(RENDER_SCALES[i] - cfg['render_scale']))
+        ox = (screen_w - 280)//2
+        self.options = [
+            OptionCycle('Res', (ox, start_y - 130), res_labels,
+                        res_labels.index(cur_res) if cur_res in res_labels else 0, self._set_resolution),
+            OptionCycle('Scale', (ox, start_y - 70), scale_labels, cur_scale, self._set_render_scale),
+        ]
+
+    def _apply(self, key, value):
+        cfg = load_config()
+        cfg[key] = value
+        save_config(cfg)
+        self.game.apply_display_settings()
+        self._build_ui()
+
+    def _set_resolution(self, label):
+        self._apply('resolution', [int(v) for v in label.split('x')])
+
+    def _set_render_scale(self, label):
+        self._apply('render_scale', int(label[:-1]) / 100)
 
     def _toggle_fullscreen(self):
         self.game.toggle_fullscreen()
@@ -29,15 +60,18 @@ class SettingsScene:
         self.game.switch_scene('menu')
 
     def handle_event(self, event):
-        for b in self.buttons:
-            b.handle_event(event)
+        for w in self.buttons + self.options:
+            w.handle_event(event)
 
     def update(self):
         pass
 
+    def dirty_rects(self):
+        return collect_dirty(self.buttons)
+
     def draw(self):
         self.screen.fill((20,20,20))
-        title = self.font.render('Settings', True, (230,230,230))
+        title = text_cache.render(self.font, 'Settings', (230,230,230))
         self.screen.blit(title, ((self.screen.get_width()-title.get_width())//2, 120))
-        for b in self.buttons:
-            b.draw(self.screen)
+        for w in self.buttons + self.options:
+            w.draw(self.screen)
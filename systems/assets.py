@@ -0,0 +1,119 @@
+import hashlib, os
+from collections import OrderedDict
+import pygame
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ASSETS_DIR = os.path.join(ROOT, 'assets')
+SCALED_CACHE_DIR = os.path.join(ROOT, 'cache', 'scaled')
+# upper bound for the pixel data of surfaces kept in memory
+MAX_SURFACE_BYTES = 64 * 1024 * 1024
+
+
+def _surface_bytes(surf):
+    return surf.get_pitch() * surf.get_height()
+
+
+class AssetManager:
+    """Lazily loaded, display-converted images with memoized scaled variants.
+
+    Scaled images are also written to cache/scaled/, keyed by a hash of the
+    source file and the target size, so the next start skips smoothscale.
+    Surfaces are evicted least-recently-used once MAX_SURFACE_BYTES is exceeded;
+    callers keep what they need alive by holding a reference.
+    """
+
+    def __init__(self, max_bytes=MAX_SURFACE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # path -> ((mtime, size), sha1) so unchanged files are hashed once
+        self._hashes = {}
+        # path -> (mtime, size) of files that failed to load
+        self._broken = {}
+
+    def path(self, rel):
+        return os.path.join(ASSETS_DIR, rel)
+
+    def exists(self, rel):
+        return os.path.exists(self.path(rel))
+
+    def _stat(self, path):
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def source_hash(self, path):
+        stat = self._stat(path)
+        known = self._hashes.get(path)
+        if known is not None and known[0] == stat:
+            return known[1]
+        with open(path, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()[:16]
+        self._hashes[path] = (stat, digest)
+        return digest
+
+    def _remember(self, key, surf):
+        self.entries[key] = surf
+        self.bytes += _surface_bytes(surf)
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= _surface_bytes(old)
+            self.evictions += 1
+        return surf
+
+    def _lookup(self, key):
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+        return surf
+
+    def image(self, rel, size=None, alpha=False):
+        # raises pygame.error / OSError when the file is missing or not an image
+        size = tuple(size) if size else None
+        key = ('image', rel, size, alpha)
+        surf = self._lookup(key)
+        if surf is not None:
+            return surf
+        path = self.path(rel)
+        if self._broken.get(path) == self._stat(path):
+            raise pygame.error(f'{rel} is not a loadable image')
+        try:
+            surf = self._load_scaled(path, size) if size else pygame.image.load(path)
+        except pygame.error:
+            self._broken[path] = self._stat(path)
+            raise
+        return self._remember(key, surf.convert_alpha() if alpha else surf.convert())
+
+    def _load_scaled(self, path, size):
+        cached = os.path.join(SCALED_CACHE_DIR, f'{self.source_hash(path)}_{size[0]}x{size[1]}.png')
+        try:
+            return pygame.image.load(cached)
+        except (pygame.error, OSError):
+            pass
+        surf = pygame.transform.smoothscale(pygame.image.load(path), size)
+        try:
+            os.makedirs(SCALED_CACHE_DIR, exist_ok=True)
+            pygame.image.save(surf, cached)
+        except (pygame.error, OSError):
+            pass
+        return surf
+
+    def generated(self, name, size, build):
+        # memoizes a procedurally drawn surface per size under the same budget
+        key = ('generated', name, tuple(size))
+        surf = self._lookup(key)
+        if surf is None:
+            surf = self._remember(key, build(size))
+        return surf
+
+    def usage(self):
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+assets = AssetManager()
@@ -0,0 +1,149 @@
+import glob, hashlib, json, os
+import pygame
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+ITEMS_DIR = os.path.join(ROOT, 'assets', 'items')
+CACHE_DIR = os.path.join(ROOT, 'cache')
+FORMAT_VERSION = 1
+ICON_SIZE = 32
+SHEET_WIDTH = 256
+PADDING = 1
+
+# generated item icons; an assets/items/<name>.png that loads replaces the icon
+ICON_COLORS = {
+    "Wood": (139, 69, 19),
+    "Stone": (128, 128, 128),
+    "Metal": (192, 192, 192),
+    "Food": (34, 139, 34),
+    "Workbench": (160, 100, 50),
+    "Wall": (120, 120, 120),
+    "Door": (100, 80, 60),
+    "FarmPlot": (80, 150, 100),
+}
+# plain entity sprites: name -> (size, color)
+SPRITES = {
+    "enemy": ((30, 30), (50, 200, 50)),
+    "loot": ((30, 30), (150, 0, 0)),
+}
+
+
+def make_icon(color):
+    surf = pygame.Surface((ICON_SIZE, ICON_SIZE), pygame.SRCALPHA)
+    pygame.draw.rect(surf, color, (0, 0, ICON_SIZE, ICON_SIZE), border_radius=6)
+    pygame.draw.rect(surf, (0, 0, 0, 60), (0, 0, ICON_SIZE, ICON_SIZE), 2, border_radius=6)
+    return surf
+
+
+def _load_item_png(path):
+    # scaled to fit the icon cell, centred; None when the file isn't a usable image
+    try:
+        img = pygame.image.load(path)
+    except (pygame.error, OSError):
+        return None
+    w, h = img.get_size()
+    scale = ICON_SIZE / max(w, h)
+    img = pygame.transform.smoothscale(img, (max(1, round(w * scale)), max(1, round(h * scale))))
+    surf = pygame.Surface((ICON_SIZE, ICON_SIZE), pygame.SRCALPHA)
+    surf.blit(img, ((ICON_SIZE - img.get_width()) // 2, (ICON_SIZE - img.get_height()) // 2))
+    return surf
+
+
+def _item_pngs():
+    return {os.path.splitext(os.path.basename(p))[0].capitalize(): p
+            for p in sorted(glob.glob(os.path.join(ITEMS_DIR, '*.png')))}
+
+
+def _source_key(pngs):
+    h = hashlib.sha1(repr((FORMAT_VERSION, ICON_SIZE, SHEET_WIDTH, sorted(ICON_COLORS.items()),
+                           sorted(SPRITES.items()))).encode())
+    for name, path in sorted(pngs.items()):
+        st = os.stat(path)
+        h.update(f'{name}:{st.st_size}:{st.st_mtime_ns}'.encode())
+    return h.hexdigest()[:16]
+
+
+def _pack(images):
+    # shelf packing, tallest first, into a SHEET_WIDTH wide sheet
+    order = sorted(images, key=lambda n: (-images[n].get_height(), n))
+    rects = {}
+    x = y = shelf_h = 0
+    for name in order:
+        w, h = images[name].get_size()
+        if x + w > SHEET_WIDTH:
+            x, y, shelf_h = 0, y + shelf_h + PADDING, 0
+        rects[name] = pygame.Rect(x, y, w, h)
+        x += w + PADDING
+        shelf_h = max(shelf_h, h)
+    sheet = pygame.Surface((SHEET_WIDTH, max(1, y + shelf_h)), pygame.SRCALPHA)
+    sheet.fill((0, 0, 0, 0))
+    for name, rect in rects.items():
+        sheet.blit(images[name], rect)
+    return sheet, rects
+
+
+def build():
+    pngs = _item_pngs()
+    images = {name: make_icon(color) for name, color in ICON_COLORS.items()}
+    for name, path in pngs.items():
+        img = _load_item_png(path)
+        if img is not None:
+            images[name] = img
+    for name, (size, color) in SPRITES.items():
+        surf = pygame.Surface(size, pygame.SRCALPHA)
+        surf.fill(color)
+        images[name] = surf
+    return _pack(images)
+
+
+class Atlas:
+    """All item icons and entity sprites on one sheet, drawn through Surface.blits batches."""
+
+    def __init__(self, sheet, rects):
+        self.sheet = sheet
+        self.rects = rects
+
+    def __contains__(self, name):
+        return name in self.rects
+
+    def entry(self, name, pos):
+        # a blits() sequence item, or None for names the atlas doesn't have
+        area = self.rects.get(name)
+        return (self.sheet, pos, area) if area is not None else None
+
+    def draw(self, surface, items):
+        # items: iterable of (name, pos)
+        blits = [(self.sheet, pos, self.rects[name]) for name, pos in items if name in self.rects]
+        surface.blits(blits, doreturn=False)
+
+
+def load():
+    # reuses the sheet cached on disk while the sources are unchanged
+    key = _source_key(_item_pngs())
+    png = os.path.join(CACHE_DIR, f'atlas_{key}.png')
+    index = os.path.join(CACHE_DIR, f'atlas_{key}.json')
+    try:
+        with open(index, 'r') as f:
+            rects = {name: pygame.Rect(r) for name, r in json.load(f).items()}
+        sheet = pygame.image.load(png)
+    except (OSError, ValueError, pygame.error):
+        sheet, rects = build()
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            for old in glob.glob(os.path.join(CACHE_DIR, 'atlas_*')):
+                os.remove(old)
+            pygame.image.save(sheet, png)
+            with open(index, 'w') as f:
+                json.dump({name: list(r) for name, r in rects.items()}, f)
+        except (OSError, pygame.error):
+            pass
+    return Atlas(sheet.convert_alpha(), rects)
+
+
+_atlas = None
+
+
+def get_atlas():
+    global _atlas
+    if _atlas is None:
+        _atlas = load()
+    return _atlas
@@ -0,0 +1,191 @@
+import json, os, threading, zlib
+from datetime import datetime
+
+# versions kept per slot and total bytes all slot histories may use on disk
+MAX_VERSIONS = 20
+MAX_HISTORY_BYTES = 32 * 1024 * 1024
+
+# History layout, one directory per slot:
+#   index.json       {"next_id": n, "versions": [{"id", "created", "bytes"}, ...]} oldest first
+#   v<id>.full.z     the newest version as compressed JSON
+#   v<id>.delta.z    every older version as a compressed patch from the version after it
+# Restoring walks back from the newest full copy, so it never applies more than
+# MAX_VERSIONS - 1 patches.
+
+_lock = threading.RLock()
+
+
+def diff(old, new):
+    # patch that turns old into new, None when they are equal
+    if old == new:
+        return None
+    if isinstance(old, dict) and isinstance(new, dict):
+        patch = {"t": "dict"}
+        sets = {k: v for k, v in new.items() if k not in old}
+        dels = [k for k in old if k not in new]
+        subs = {}
+        for k in old:
+            if k in new:
+                p = diff(old[k], new[k])
+                if p is not None:
+                    subs[k] = p
+        if sets: patch["set"] = sets
+        if dels: patch["del"] = dels
+        if subs: patch["sub"] = subs
+        return patch
+    if isinstance(old, list) and isinstance(new, list):
+        n = len(old)
+        if len(new) > n and new[:n] == old:
+            return {"t": "ext", "add": new[n:]}
+        if len(new) < n and old[:len(new)] == new:
+            return {"t": "cut", "len": len(new)}
+        if len(new) == n:
+            subs = {}
+            for i in range(n):
+                p = diff(old[i], new[i])
+                if p is not None:
+                    subs[str(i)] = p
+            if len(subs) * 2 < n:
+                return {"t": "list", "sub": subs}
+    return {"t": "val", "v": new}
+
+
+def patch(value, p):
+    if p is None:
+        return value
+    t = p["t"]
+    if t == "val":
+        return p["v"]
+    if t == "dict":
+        out = dict(value)
+        for k in p.get("del", []):
+            out.pop(k, None)
+        out.update(p.get("set", {}))
+        for k, sub in p.get("sub", {}).items():
+            out[k] = patch(out[k], sub)
+        return out
+    if t == "ext":
+        return value + p["add"]
+    if t == "cut":
+        return value[:p["len"]]
+    if t == "list":
+        out = list(value)
+        for i, sub in p["sub"].items():
+            out[int(i)] = patch(out[int(i)], sub)
+        return out
+    raise ValueError(f"unknown patch type {t}")
+
+
+def _write(path, obj):
+    blob = zlib.compress(json.dumps(obj, separators=(',', ':')).encode('utf-8'))
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(blob)
+    os.replace(tmp, path)
+    return len(blob)
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return json.loads(zlib.decompress(f.read()).decode('utf-8'))
+
+
+def _full_file(slot_dir, vid):
+    return os.path.join(slot_dir, f'v{vid}.full.z')
+
+
+def _delta_file(slot_dir, vid):
+    return os.path.join(slot_dir, f'v{vid}.delta.z')
+
+
+def _load_index(slot_dir):
+    try:
+        with open(os.path.join(slot_dir, 'index.json'), 'r') as f:
+            return json.load(f)
+    except Exception:
+        return {"next_id": 1, "versions": []}
+
+
+def _save_index(slot_dir, index):
+    path = os.path.join(slot_dir, 'index.json')
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp, path)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def list_versions(slot_dir):
+    with _lock:
+        return [dict(v) for v in _load_index(slot_dir)["versions"]]
+
+
+def checkpoint(slot_dir, data):
+    """Record data as the newest version; returns its id, or None if unchanged."""
+    with _lock:
+        os.makedirs(slot_dir, exist_ok=True)
+        index = _load_index(slot_dir)
+        versions = index["versions"]
+        if versions:
+            newest = versions[-1]
+            previous = _read(_full_file(slot_dir, newest["id"]))
+            back = diff(data, previous)
+            if back is None:
+                return None
+            # the previous newest becomes a patch from the version we are adding
+            newest["bytes"] = _write(_delta_file(slot_dir, newest["id"]), back)
+            _remove(_full_file(slot_dir, newest["id"]))
+        vid = index["next_id"]
+        index["next_id"] = vid + 1
+        size = _write(_full_file(slot_dir, vid), data)
+        versions.append({"id": vid, "created": datetime.now().isoformat(), "bytes": size})
+        while len(versions) > MAX_VERSIONS:
+            _remove(_delta_file(slot_dir, versions.pop(0)["id"]))
+        _save_index(slot_dir, index)
+        return vid
+
+
+def load_version(slot_dir, vid):
+    with _lock:
+        versions = _load_index(slot_dir)["versions"]
+        ids = [v["id"] for v in versions]
+        if vid not in ids:
+            return None
+        data = _read(_full_file(slot_dir, ids[-1]))
+        for v in reversed(ids[ids.index(vid):-1]):
+            data = patch(data, _read(_delta_file(slot_dir, v)))
+        return data
+
+
+def enforce_cap(history_dir, max_bytes=MAX_HISTORY_BYTES):
+    # drop the oldest patches across all slots until the histories fit in max_bytes
+    with _lock:
+        try:
+            names = os.listdir(history_dir)
+        except FileNotFoundError:
+            return
+        indexes = {}
+        total = 0
+        for name in names:
+            slot_dir = os.path.join(history_dir, name)
+            if os.path.isdir(slot_dir):
+                indexes[slot_dir] = _load_index(slot_dir)
+                total += sum(v["bytes"] for v in indexes[slot_dir]["versions"])
+        while total > max_bytes:
+            oldest = None
+            for slot_dir, index in indexes.items():
+                versions = index["versions"]
+                if len(versions) > 1 and (oldest is None or versions[0]["created"] < indexes[oldest]["versions"][0]["created"]):
+                    oldest = slot_dir
+            if oldest is None:
+                break
+            v = indexes[oldest]["versions"].pop(0)
+            _remove(_delta_file(oldest, v["id"]))
+            total -= v["bytes"]
+            _save_index(oldest, indexes[oldest])
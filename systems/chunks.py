@@ -0,0 +1,113 @@
+import pygame
+from systems.slot_preview import STRUCTURE_COLORS
+
+# 16 tiles of 40 px, so grid-aligned structures never straddle two chunks
+CHUNK_SIZE = 640
+# fills the empty parts of a chunk when there is no ground; never used by a structure
+TRANSPARENT = (255, 0, 255)
+
+
+def structure_color(kind):
+    return STRUCTURE_COLORS.get(kind, STRUCTURE_COLORS["FarmPlot"])
+
+
+class StructureLayer:
+    """Structures baked onto world-space chunk surfaces, optionally over a ground tile.
+
+    Every chunk's structures are kept in members; surfaces are only baked for
+    chunks near the view (stream() drops the rest), and add()/remove() patch a
+    baked chunk in place. draw() composites the visible chunks with one blits()
+    call, so its cost depends on the view size, not on the number of structures.
+    """
+
+    def __init__(self, ground=None, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+        # chunk-sized surface under every chunk; None leaves empty areas transparent
+        self.ground = ground
+        self.chunks = {}
+        # (cx, cy) -> structures overlapping that chunk, in placement order
+        self.members = {}
+
+    def keys_in(self, rect):
+        cs = self.chunk_size
+        for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1):
+            for cx in range(rect.left // cs, (rect.right - 1) // cs + 1):
+                yield cx, cy
+
+    def key_at(self, x, y):
+        return int(x) // self.chunk_size, int(y) // self.chunk_size
+
+    def _bake(self, key):
+        if self.ground is not None:
+            surf = self.ground.copy()
+        else:
+            surf = pygame.Surface((self.chunk_size, self.chunk_size))
+            surf.fill(TRANSPARENT)
+            surf.set_colorkey(TRANSPARENT)
+        self.chunks[key] = surf
+        for s in self.members[key]:
+            self._paint(key, s)
+        return surf
+
+    def _paint(self, key, structure):
+        ox, oy = key[0] * self.chunk_size, key[1] * self.chunk_size
+        pygame.draw.rect(self.chunks[key], structure_color(structure['type']), structure['rect'].move(-ox, -oy))
+
+    def rebuild(self, structures):
+        self.chunks = {}
+        self.members = {}
+        for s in structures:
+            self.add(s)
+
+    def add(self, structure):
+        for key in self.keys_in(structure['rect']):
+            self.members.setdefault(key, []).append(structure)
+            if key in self.chunks:
+                self._paint(key, structure)
+
+    def remove(self, structure):
+        rect = structure['rect']
+        for key in self.keys_in(rect):
+            members = self.members.get(key)
+            if not members or structure not in members:
+                continue
+            members.remove(structure)
+            if not members:
+                del self.members[key]
+                self.chunks.pop(key, None)
+                continue
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            ox, oy = key[0] * self.chunk_size, key[1] * self.chunk_size
+            # clipped up front: fill() keeps the full height of rects starting above the surface
+            hole = rect.move(-ox, -oy).clip(chunk.get_rect())
+            if self.ground is not None:
+                chunk.blit(self.ground, hole, hole)
+            else:
+                chunk.fill(TRANSPARENT, hole)
+            # repaint neighbours in placement order, clipped so nothing outside the hole changes
+            chunk.set_clip(hole)
+            for other in members:
+                if other['rect'].colliderect(rect):
+                    self._paint(key, other)
+            chunk.set_clip(None)
+
+    def stream(self, view, margin=None):
+        # forget baked surfaces of chunks further than margin from the view
+        margin = self.chunk_size if margin is None else margin
+        keep = set(self.keys_in(view.inflate(margin * 2, margin * 2)))
+        for key in [k for k in self.chunks if k not in keep]:
+            del self.chunks[key]
+
+    def draw(self, surface, offset=(0, 0)):
+        # offset is the world position shown at the surface's top-left
+        cs = self.chunk_size
+        blits = []
+        for key in self.keys_in(pygame.Rect(offset, surface.get_size())):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self._bake(key) if key in self.members else self.ground
+            if chunk is not None:
+                blits.append((chunk, (key[0] * cs - offset[0], key[1] * cs - offset[1])))
+        surface.blits(blits, doreturn=False)
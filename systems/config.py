@@ -5,8 +5,17 @@ CFG_FILE = os.path.join(ROOT, 'config.json')
 
 DEFAULT_CFG = {
     "fullscreen": True,
-    "resolution": [1920, 1080]
+    "resolution": [1920, 1080],
+    "render_scale": 1.0,
+    "sim_hz": 60,
+    "fps_cap": 120
 }
+RESOLUTIONS = ([1280, 720], [1600, 900], [1920, 1080], [2560, 1440])
+# no 0.5: MIN_RENDER_SIZE raised it to 1067x600 at all but the largest
+# resolution, so it gave the same size as 0.75 or close to it
+RENDER_SCALES = (0.75, 1.0)
+# scenes place their panels in absolute pixels up to this size
+MIN_RENDER_SIZE = (800, 600)
 
 
 def load_config():
@@ -19,6 +28,8 @@ def load_config():
     for k, v in DEFAULT_CFG.items():
         if k not in data:
             data[k] = v
+    # scales that are no longer offered, e.g. 0.5 from older configs
+    data['render_scale'] = min(RENDER_SCALES, key=lambda s: abs(s - data['render_scale']))
     return data
 
 
@@ -28,3 +39,11 @@ def save_config(cfg):
     with open(CFG_FILE, 'w') as f:
         json.dump(data, f)
     return data
+
+
+def render_size(cfg):
+    # size of the surface scenes draw on, before it is scaled to the display
+    w, h = cfg['resolution']
+    # one factor for both axes, raised until the minimum fits, so the aspect ratio holds
+    scale = max(cfg['render_scale'], MIN_RENDER_SIZE[0] / w, MIN_RENDER_SIZE[1] / h)
+    return round(w * scale), round(h * scale)
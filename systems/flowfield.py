@@ -0,0 +1,133 @@
+from collections import deque
+import numpy as np
+from systems.occupancy import EMPTY, STRUCTURE_IDS
+
+UNREACHABLE = np.iinfo(np.int32).max
+# neighbour offsets (dx, dy), straight ones first so ties prefer them
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+
+
+class FlowField:
+    """Shared path directions toward one goal over a walkable grid.
+
+    A breadth-first integration from the goal cell gives every cell its step
+    distance, and each cell points at its cheapest neighbour. The field is only
+    recomputed when the goal moves to another cell or the obstacles change, at
+    O(grid) cost; any number of walkers then sample it in one array lookup.
+    """
+
+    def __init__(self, walkable, cell=40, origin=(0, 0)):
+        self.cell = cell
+        self.origin = np.array(origin, float)
+        self.walkable = np.array(walkable, bool)
+        h, w = self.walkable.shape
+        self.distance = np.full((h, w), UNREACHABLE, np.int32)
+        self.directions = np.zeros((h, w, 2))
+        self.goal = None
+        self.dirty = True
+
+    @classmethod
+    def from_occupancy(cls, occupancy, bounds, passable=()):
+        # walkable grid over bounds (a world rect) from an OccupancyGrid: free tiles
+        # and tiles of the passable structure kinds can be walked on
+        t, n = occupancy.tile, occupancy.chunk_tiles
+        tx0, ty0 = bounds.left // t, bounds.top // t
+        w, h = -(-bounds.right // t) - tx0, -(-bounds.bottom // t) - ty0
+        ids = np.zeros((h, w), np.uint8)
+        for (cx, cy), chunk in occupancy.chunks.items():
+            x0, y0 = cx * n - tx0, cy * n - ty0
+            xa, xb, ya, yb = max(x0, 0), min(x0 + n, w), max(y0, 0), min(y0 + n, h)
+            if xa < xb and ya < yb:
+                tiles = np.frombuffer(chunk, np.uint8).reshape(n, n)
+                ids[ya:yb, xa:xb] = tiles[ya - y0:yb - y0, xa - x0:xb - x0]
+        walkable = np.isin(ids, [EMPTY] + [STRUCTURE_IDS[k] for k in passable])
+        return cls(walkable, t, (tx0 * t, ty0 * t))
+
+    def cell_at(self, x, y):
+        # grid (cx, cy) of a world position, None outside the grid
+        cx, cy = np.floor((np.array((x, y), float) - self.origin) / self.cell).astype(int)
+        h, w = self.walkable.shape
+        return (int(cx), int(cy)) if 0 <= cx < w and 0 <= cy < h else None
+
+    def set_goal(self, x, y):
+        goal = self.cell_at(x, y)
+        if goal != self.goal:
+            self.goal = goal
+            self.dirty = True
+
+    def set_walkable(self, walkable):
+        walkable = np.asarray(walkable, bool)
+        if not np.array_equal(walkable, self.walkable):
+            self.walkable = walkable.copy()
+            self.dirty = True
+
+    def set_blocked(self, cx, cy, blocked=True):
+        if self.walkable[cy, cx] == blocked:
+            self.walkable[cy, cx] = not blocked
+            self.dirty = True
+
+    def refresh(self):
+        if self.dirty:
+            self._integrate()
+            self._point()
+            self.dirty = False
+
+    def _integrate(self):
+        # plain breadth-first search on flat lists: O(cells), and faster here than
+        # a NumPy wavefront, whose per-wave overhead adds up over the grid's width
+        h, w = self.walkable.shape
+        n = h * w
+        dist = [UNREACHABLE] * n
+        if self.goal is not None and self.walkable[self.goal[1], self.goal[0]]:
+            walk = self.walkable.ravel().tolist()
+            start = self.goal[1] * w + self.goal[0]
+            dist[start] = 0
+            queue = deque([start])
+            pop, push = queue.popleft, queue.append
+            while queue:
+                i = pop()
+                d = dist[i] + 1
+                x = i % w
+                if x > 0 and walk[i - 1] and dist[i - 1] == UNREACHABLE:
+                    dist[i - 1] = d; push(i - 1)
+                if x < w - 1 and walk[i + 1] and dist[i + 1] == UNREACHABLE:
+                    dist[i + 1] = d; push(i + 1)
+                if i >= w and walk[i - w] and dist[i - w] == UNREACHABLE:
+                    dist[i - w] = d; push(i - w)
+                if i < n - w and walk[i + w] and dist[i + w] == UNREACHABLE:
+                    dist[i + w] = d; push(i + w)
+        self.distance = np.array(dist, np.int32).reshape(h, w)
+
+    def _point(self):
+        # every reachable cell points at its lowest-distance neighbour; diagonals
+        # only where both straight cells beside them are open, so nothing cuts corners
+        h, w = self.walkable.shape
+        padded = np.full((h + 2, w + 2), UNREACHABLE, np.int32)
+        padded[1:-1, 1:-1] = self.distance
+        def shifted(dx, dy):
+            return padded[1 + dy:h + 1 + dy, 1 + dx:w + 1 + dx]
+        costs = []
+        for dx, dy in STEPS:
+            cost = shifted(dx, dy)
+            if dx and dy:
+                open_ = (shifted(dx, 0) != UNREACHABLE) & (shifted(0, dy) != UNREACHABLE)
+                cost = np.where(open_, cost, UNREACHABLE)
+            costs.append(cost)
+        costs = np.stack(costs)
+        best = costs.argmin(axis=0)
+        downhill = np.take_along_axis(costs, best[None], 0)[0] < self.distance
+        steps = np.array(STEPS, float)
+        steps /= np.hypot(steps[:, 0], steps[:, 1])[:, None]
+        self.directions = np.where(downhill[..., None], steps[best], 0.0)
+
+    def sample(self, points):
+        # unit directions for an (n, 2) array of world positions; zero outside the
+        # grid, in cells cut off from the goal and in the goal cell itself. Walls
+        # next to reachable cells point out of the wall
+        self.refresh()
+        cells = np.floor((np.asarray(points, float) - self.origin) / self.cell).astype(np.int64)
+        h, w = self.walkable.shape
+        inside = (cells[:, 0] >= 0) & (cells[:, 0] < w) & (cells[:, 1] >= 0) & (cells[:, 1] < h)
+        out = np.zeros((len(cells), 2))
+        out[inside] = self.directions[cells[inside, 1], cells[inside, 0]]
+        return out
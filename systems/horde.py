@@ -0,0 +1,178 @@
+import numpy as np
+
+ENEMY_SIZE = 30
+IDLE, CHASE, ALERT = 0, 1, 2
+WALKER = 0
+
+
+class Horde:
+    """Raid enemies as a structure of NumPy arrays.
+
+    Row i of pos/prev/vel/hp/max_hp/state/kind is enemy i; only the first count rows
+    are live. Movement, separation, attack-cone tests and culling run as
+    whole-array operations, so their Python cost does not grow with the
+    number of enemies. Positions are the sprite's top-left, like the rects
+    they replace.
+    """
+
+    SPEED = 60  # px per second while chasing
+    AGGRO_RANGE = 260
+    CONTACT_RANGE = 24
+    SEPARATION_CELL = 32
+    # noise intensity at which an enemy that can't see the player walks toward it
+    HEARING = 0.5
+    SEPARATION_SPEED = 120
+    MAX_GRID_CELLS = 1 << 18
+
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.pos = np.zeros((capacity, 2))
+        # positions before the last update, for interpolated drawing
+        self.prev = np.zeros((capacity, 2))
+        self.vel = np.zeros((capacity, 2))
+        self.hp = np.zeros(capacity, np.int16)
+        self.max_hp = np.zeros(capacity, np.int16)
+        self.state = np.zeros(capacity, np.uint8)
+        self.kind = np.zeros(capacity, np.uint8)
+
+    def __len__(self):
+        return self.count
+
+    def _fields(self):
+        return ('pos', 'prev', 'vel', 'hp', 'max_hp', 'state', 'kind')
+
+    def _reserve(self, n):
+        capacity = len(self.hp)
+        if n <= capacity:
+            return
+        while capacity < n:
+            capacity *= 2
+        for name in self._fields():
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def clear(self):
+        self.count = 0
+
+    def spawn(self, xs, ys, hp=2, kind=WALKER):
+        n = len(xs)
+        self._reserve(self.count + n)
+        s = slice(self.count, self.count + n)
+        self.pos[s, 0] = xs
+        self.pos[s, 1] = ys
+        self.prev[s] = self.pos[s]
+        self.vel[s] = 0
+        self.hp[s] = hp
+        self.max_hp[s] = hp
+        self.state[s] = IDLE
+        self.kind[s] = kind
+        self.count += n
+
+    def update(self, dt_ms, target, flow=None, noise=None):
+        # flow is an optional FlowField toward target; enemies outside it, or
+        # already in the target's cell, head straight for the target. noise is
+        # an optional NoiseField: enemies out of aggro range that hear enough
+        # of it climb its gradient toward where it came from.
+        n = self.count
+        if not n:
+            return
+        pos, vel = self.pos[:n], self.vel[:n]
+        self.prev[:n] = pos
+        half = ENEMY_SIZE / 2
+        to = np.asarray(target, float) - (pos + half)
+        dist = np.hypot(to[:, 0], to[:, 1])
+        chase = dist < self.AGGRO_RANGE
+        step = chase & (dist > self.CONTACT_RANGE)
+        heading = to / np.maximum(dist, 1e-6)[:, None]
+        if flow is not None:
+            path = flow.sample(pos + half)
+            heading = np.where(path.any(axis=1)[:, None], path, heading)
+        alert = np.zeros(n, bool)
+        if noise is not None:
+            climb = noise.gradient(pos + half)
+            length = np.hypot(climb[:, 0], climb[:, 1])
+            alert = ~chase & (noise.sample(pos + half) >= self.HEARING) & (length > 1e-9)
+            heading[alert] = climb[alert] / length[alert, None]
+            step |= alert
+        self.state[:n] = np.where(chase, CHASE, np.where(alert, ALERT, IDLE))
+        vel[:] = 0
+        vel[step] = heading[step] * self.SPEED
+        vel += self._separation(pos)
+        pos += vel * (dt_ms / 1000)
+
+    def _separation(self, pos):
+        # push enemies down the gradient of a crowd density grid: each enemy is
+        # splatted onto the four nearest cell corners, the gradient is taken per
+        # cell and read back with the same weights. Bincounts and array slicing
+        # only, no pairwise checks, and smooth across cell borders.
+        size = self.SEPARATION_CELL
+        while True:
+            g = pos / size
+            lo = np.floor(g.min(axis=0)) - 2
+            g -= lo
+            base = g.astype(np.int64)
+            w, h = base.max(axis=0) + 4
+            if w * h <= self.MAX_GRID_CELLS:
+                break
+            # a very spread-out horde coarsens the grid instead of allocating a huge one
+            size *= 2
+        f = g - base
+        corners = []
+        for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            weight = (f[:, 0] if dx else 1 - f[:, 0]) * (f[:, 1] if dy else 1 - f[:, 1])
+            corners.append(((base[:, 1] + dy) * w + base[:, 0] + dx, weight))
+        density = sum(np.bincount(ids, weight, w * h) for ids, weight in corners).reshape(h, w)
+        gy, gx = np.gradient(density)
+        gx, gy = gx.ravel(), gy.ravel()
+        flat = density.ravel()
+        push = np.zeros_like(pos)
+        crowd = np.zeros(len(pos))
+        for ids, weight in corners:
+            push[:, 0] -= gx[ids] * weight
+            push[:, 1] -= gy[ids] * weight
+            # density around the enemy minus its own splat
+            crowd += (flat[ids] - weight) * weight
+        # enemies stacked on one spot get the same gradient, so a fixed per-row
+        # heading, scaled by how crowded they are, pulls them apart
+        spin = np.arange(len(pos)) * 2.399963
+        push += np.stack([np.cos(spin), np.sin(spin)], axis=1) * np.minimum(crowd, 1)[:, None] * 0.5
+        return push * self.SEPARATION_SPEED
+
+    def cone_hits(self, origin, angle, spread, radius):
+        # indices of enemies whose centre is within radius and within spread/2 degrees of angle
+        n = self.count
+        centre = self.pos[:n] + ENEMY_SIZE // 2
+        d = centre - np.asarray(origin, float)
+        dist = np.hypot(d[:, 0], d[:, 1])
+        ang = np.degrees(np.arctan2(d[:, 1], d[:, 0]))
+        off = np.abs((ang - angle + 180) % 360 - 180)
+        return np.flatnonzero((dist <= radius) & (off <= spread / 2))
+
+    def damage(self, indices, amount=1):
+        self.hp[indices] -= amount
+
+    def cull(self):
+        # drop dead enemies, keeping the order of the living; returns how many died
+        n = self.count
+        alive = np.flatnonzero(self.hp[:n] > 0)
+        if len(alive) == n:
+            return 0
+        for name in self._fields():
+            arr = getattr(self, name)
+            arr[:len(alive)] = arr[alive]
+        self.count = len(alive)
+        return n - len(alive)
+
+    def draw_positions(self, alpha):
+        # integer top-lefts between the last two updates
+        n = self.count
+        prev = self.prev[:n]
+        return (prev + (self.pos[:n] - prev) * alpha).astype(np.int64)
+
+    def visible(self, positions, view, margin=0):
+        # indices of enemies whose sprite overlaps view grown by margin
+        x, y = positions[:, 0], positions[:, 1]
+        return np.flatnonzero((x + ENEMY_SIZE > view.left - margin) & (x < view.right + margin)
+                              & (y + ENEMY_SIZE > view.top - margin) & (y < view.bottom + margin))
@@ -0,0 +1,18 @@
+import pygame
+
+
+class InputState:
+    """Keyboard and mouse state captured once per frame and shared by update and draw."""
+
+    def __init__(self):
+        self.mouse_pos = (0, 0)
+        self.mouse_buttons = (False, False, False)
+        self.keys = ()
+        # maps display coordinates to render-surface ones; set by Game
+        self.to_render = None
+
+    def capture(self):
+        pos = pygame.mouse.get_pos()
+        self.mouse_pos = self.to_render(pos) if self.to_render else pos
+        self.mouse_buttons = pygame.mouse.get_pressed()
+        self.keys = pygame.key.get_pressed()
@@ -0,0 +1,84 @@
+import math
+import numpy as np
+
+
+class NoiseField:
+    """How loud each part of the map is, spreading out and fading over time.
+
+    Emitters deposit into the cell under them; step() diffuses every cell
+    toward its neighbours and decays the whole grid. Steps run at a fixed low
+    rate from update(), so the cost is one grid pass per tick no matter how
+    many emitters or listeners there are. Positions outside the grid use the
+    nearest edge cell.
+    """
+
+    TICK_MS = 200
+    DIFFUSION = 0.2  # share exchanged with each neighbour per tick; stable below 0.25
+    HALF_LIFE_MS = 30000
+
+    def __init__(self, shape, cell=80, origin=(0, 0)):
+        self.cell = cell
+        self.origin = np.array(origin, float)
+        self.grid = np.zeros(shape)
+        # per-cell slope of grid, refreshed by step() so listeners only index it
+        self.gx = np.zeros(shape)
+        self.gy = np.zeros(shape)
+        self.pending_ms = 0.0
+        self.decay = math.pow(0.5, self.TICK_MS / self.HALF_LIFE_MS)
+
+    def clear(self):
+        self.grid[:] = 0
+        self.gx[:] = 0
+        self.gy[:] = 0
+        self.pending_ms = 0.0
+
+    def _cells(self, points):
+        cells = np.floor((np.asarray(points, float).reshape(-1, 2) - self.origin) / self.cell).astype(np.int64)
+        h, w = self.grid.shape
+        return np.clip(cells[:, 0], 0, w - 1), np.clip(cells[:, 1], 0, h - 1)
+
+    def deposit(self, x, y, amount):
+        cx, cy = self._cells((x, y))
+        self.grid[cy[0], cx[0]] += amount
+
+    def spread(self, amount):
+        # amount shared evenly by every cell, for noise with no known source
+        self.grid += amount / self.grid.size
+
+    def update(self, dt_ms):
+        # returns how many steps ran, so callers can react once per tick
+        self.pending_ms += dt_ms
+        steps = 0
+        while self.pending_ms >= self.TICK_MS:
+            self.pending_ms -= self.TICK_MS
+            self.step()
+            steps += 1
+        return steps
+
+    def step(self):
+        # edge-padded, so noise reflects off the border instead of leaking out
+        g = np.pad(self.grid, 1, mode='edge')
+        around = g[:-2, 1:-1] + g[2:, 1:-1] + g[1:-1, :-2] + g[1:-1, 2:]
+        self.grid += self.DIFFUSION * (around - 4 * self.grid)
+        self.grid *= self.decay
+        self.gy, self.gx = np.gradient(self.grid)
+
+    def sample(self, points):
+        # intensity at each of an (n, 2) array of world positions
+        cx, cy = self._cells(points)
+        return self.grid[cy, cx]
+
+    def gradient(self, points):
+        # direction of rising noise at each position, (n, 2), unnormalised; as of
+        # the last step, so deposits since then are not heard until the next tick
+        cx, cy = self._cells(points)
+        return np.stack([self.gx[cy, cx], self.gy[cy, cx]], axis=1)
+
+    def total(self):
+        # all the noise on the map, the value the HUD shows
+        return float(self.grid.sum())
+
+    def loudest(self):
+        # world centre of the loudest cell
+        cy, cx = np.unravel_index(int(self.grid.argmax()), self.grid.shape)
+        return tuple(self.origin + (np.array((cx, cy)) + 0.5) * self.cell)
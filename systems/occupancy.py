@@ -0,0 +1,66 @@
+TILE = 40
+# tiles per chunk side; 16 * 40 matches systems.chunks.CHUNK_SIZE
+CHUNK_TILES = 16
+EMPTY = 0
+# one byte per tile: the type id of the structure covering it, EMPTY when free.
+# Ids are stable; kinds missing here (e.g. from older saves) are stored as UNKNOWN.
+STRUCTURE_IDS = {"Wall": 1, "Door": 2, "Workbench": 3, "FarmPlot": 4}
+UNKNOWN = 255
+KINDS = {v: k for k, v in STRUCTURE_IDS.items()}
+
+
+class OccupancyGrid:
+    """Which structure type covers each grid tile of the world.
+
+    Tiles live in a bytearray per chunk, allocated on the first write, so the
+    world is unbounded and a lookup is two divisions and an index. Structures
+    cover every tile their rect touches, so multi-tile footprints just work.
+    """
+
+    def __init__(self, tile=TILE, chunk_tiles=CHUNK_TILES):
+        self.tile = tile
+        self.chunk_tiles = chunk_tiles
+        self.chunks = {}
+
+    def tiles(self, rect):
+        t = self.tile
+        return [(tx, ty)
+                for ty in range(rect.top // t, (rect.bottom - 1) // t + 1)
+                for tx in range(rect.left // t, (rect.right - 1) // t + 1)]
+
+    def get(self, tx, ty):
+        n = self.chunk_tiles
+        chunk = self.chunks.get((tx // n, ty // n))
+        return EMPTY if chunk is None else chunk[(ty % n) * n + tx % n]
+
+    def _set(self, tx, ty, value):
+        n = self.chunk_tiles
+        key = (tx // n, ty // n)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            if value == EMPTY:
+                return
+            chunk = self.chunks[key] = bytearray(n * n)
+        chunk[(ty % n) * n + tx % n] = value
+
+    def kind_at(self, x, y):
+        # structure kind at a world position, None when the tile is free
+        value = self.get(int(x) // self.tile, int(y) // self.tile)
+        return None if value == EMPTY else KINDS.get(value, 'unknown')
+
+    def is_free(self, rect):
+        return all(self.get(tx, ty) == EMPTY for tx, ty in self.tiles(rect))
+
+    def fill(self, rect, kind):
+        value = STRUCTURE_IDS.get(kind, UNKNOWN)
+        for tx, ty in self.tiles(rect):
+            self._set(tx, ty, value)
+
+    def clear(self, rect):
+        for tx, ty in self.tiles(rect):
+            self._set(tx, ty, EMPTY)
+
+    def rebuild(self, structures):
+        self.chunks = {}
+        for s in structures:
+            self.fill(s['rect'], s['type'])
@@ -0,0 +1,173 @@
+import csv, functools, json, os, time
+from collections import deque
+import pygame
+from systems import text_cache
+from systems.assets import assets
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+EXPORT_DIR = os.path.join(ROOT, 'profiles')
+HISTORY_FRAMES = 600
+GRAPH_FRAMES = 240
+STATS_EVERY = 30
+
+
+class _NullSection:
+    __slots__ = ()
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SECTION = _NullSection()
+
+
+class _Section:
+    __slots__ = ('profiler', 'name', 'start')
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    def __exit__(self, *exc):
+        self.profiler.add(self.name, (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+class Profiler:
+    """Per-frame phase timings with rolling percentiles, an overlay and CSV/JSON export.
+
+    While disabled, section() returns a shared no-op context manager and timed()
+    wrappers only check a flag, so instrumentation can stay in place.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.frames = deque(maxlen=HISTORY_FRAMES)
+        self.current = None
+        self.frame_start = None
+        self.frame_index = 0
+        # timings reported by other threads, merged into the next finished frame
+        self.background = deque()
+        self.names = []
+        self.stats = {}
+        self.font = None
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.frames.clear()
+        self.current = None
+        self.stats = {}
+
+    def keep(self, frames):
+        # grow the frame history, e.g. so a whole replay can be exported
+        self.frames = deque(self.frames, maxlen=frames)
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL_SECTION
+        return _Section(self, name)
+
+    def timed(self, name):
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.add(name, (time.perf_counter() - start) * 1000)
+            return wrapper
+        return decorate
+
+    def add(self, name, ms):
+        if self.current is None:
+            return
+        if name not in self.current:
+            self.current[name] = 0.0
+            if name not in self.names:
+                self.names.append(name)
+        self.current[name] += ms
+
+    def add_background(self, name, ms):
+        # safe to call from worker threads
+        if self.enabled:
+            self.background.append((name, ms))
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.current is not None:
+            while self.background:
+                self.add(*self.background.popleft())
+            self.current['frame'] = (now - self.frame_start) * 1000
+            self.frames.append(self.current)
+            self.frame_index += 1
+            if self.frame_index % STATS_EVERY == 0:
+                self.stats = self._compute_stats()
+        self.current = {'index': self.frame_index}
+        self.frame_start = now
+
+    def _compute_stats(self):
+        stats = {}
+        for name in ['frame'] + self.names:
+            values = sorted(f.get(name, 0.0) for f in self.frames)
+            if values:
+                stats[name] = {p: values[min(len(values) - 1, int(len(values) * p / 100))] for p in (50, 95, 99)}
+        return stats
+
+    def percentiles(self, name):
+        return self._compute_stats().get(name)
+
+    def export(self, basename=None):
+        # writes <basename>.csv with one row per frame and <basename>.json with rows and percentiles
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        basename = basename or time.strftime('profile_%Y%m%d_%H%M%S')
+        path = os.path.join(EXPORT_DIR, basename)
+        columns = ['index', 'frame'] + self.names
+        rows = list(self.frames)
+        with open(path + '.csv', 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow([round(row.get(c, 0.0), 4) for c in columns])
+        with open(path + '.json', 'w') as f:
+            json.dump({'columns': columns, 'frames': rows, 'percentiles': self._compute_stats()}, f)
+        return path
+
+    def draw_overlay(self, surface):
+        if not self.enabled:
+            return
+        if self.font is None:
+            self.font = text_cache.get_font(18)
+        gw, gh = GRAPH_FRAMES + 80, 80
+        x0, y0 = surface.get_width() - gw - 10, 10
+        rows = [('phase', 'p50', 'p95', 'p99')]
+        for name, st in self.stats.items():
+            rows.append((name[:28], f'{st[50]:.2f}', f'{st[95]:.2f}', f'{st[99]:.2f}'))
+        tc = text_cache.text_cache.stats()
+        rows.append(('text cache hit% / KB / n', f"{tc['hit_rate'] * 100:.0f}", str(tc['bytes'] // 1024), str(tc['entries'])))
+        au = assets.usage()
+        rows.append(('assets MB / budget / n', f"{au['bytes'] / 2**20:.1f}", str(au['max_bytes'] // 2**20), str(au['entries'])))
+        panel = pygame.Rect(x0 - 10, y0, gw + 20, gh + 16 + len(rows) * 16)
+        shade = pygame.Surface(panel.size, pygame.SRCALPHA)
+        shade.fill((0, 0, 0, 170))
+        surface.blit(shade, panel)
+        # frame-time graph, 2 px per ms, with 16.7 and 33.3 ms guides
+        base_y = y0 + gh
+        for ms, color in ((1000 / 60, (60, 160, 60)), (1000 / 30, (160, 60, 60))):
+            gy = base_y - int(ms * 2)
+            pygame.draw.line(surface, color, (x0, gy), (x0 + gw, gy))
+        recent = list(self.frames)[-GRAPH_FRAMES:]
+        for i, f in enumerate(recent):
+            h = min(gh, int(f.get('frame', 0.0) * 2))
+            pygame.draw.line(surface, (230, 230, 120), (x0 + i, base_y), (x0 + i, base_y - h))
+        for i, row in enumerate(rows):
+            for col, (text, cx) in enumerate(zip(row, (0, gw - 120, gw - 80, gw - 40))):
+                surface.blit(text_cache.render(self.font, text, (230, 230, 230)), (x0 + cx, base_y + 8 + i * 16))
+
+
+profiler = Profiler()
@@ -0,0 +1,98 @@
+import glob, gzip, json, os
+import pygame
+from systems.input_state import InputState
+
+FORMAT_VERSION = 2
+# developer keys (profiler toggle/export) are not part of the recorded input
+DEV_KEYS = (pygame.K_F3, pygame.K_F4)
+SAVE_PATTERNS = ('meta.json', 'save_slot*.json', 'save_slot*.journal')
+
+
+def snapshot_saves(directory):
+    # the saves a recording starts from, so a replay sees the same world
+    files = {}
+    for pattern in SAVE_PATTERNS:
+        for path in glob.glob(os.path.join(directory, pattern)):
+            with open(path, 'r') as f:
+                files[os.path.basename(path)] = f.read()
+    return files
+
+
+def _encode_event(event):
+    attrs = {}
+    for key, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)):
+            attrs[key] = value
+        elif isinstance(value, tuple) and all(isinstance(v, (int, float)) for v in value):
+            attrs[key] = list(value)
+    return [event.type, attrs]
+
+
+def _decode_event(data):
+    etype, attrs = data
+    return pygame.event.Event(etype, {k: tuple(v) if isinstance(v, list) else v for k, v in attrs.items()})
+
+
+class InputRecorder:
+    """Writes one gzip'd JSON line per frame: frame time, mouse, held keys and events.
+
+    Positions are in render-surface coordinates, so a replay doesn't depend on the display.
+    """
+
+    def __init__(self, path, seed, sim_hz, render_size, saves):
+        self.path = path
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        header = {'version': FORMAT_VERSION, 'seed': seed, 'sim_hz': sim_hz,
+                  'render_size': list(render_size), 'saves': saves}
+        self.file.write(json.dumps(header) + '\n')
+        self.frames = 0
+
+    def record(self, frame_ms, events, state):
+        keys = [i for i, down in enumerate(state.keys) if down]
+        encoded = [_encode_event(e) for e in events
+                   if not (e.type == pygame.KEYDOWN and e.key in DEV_KEYS)]
+        row = [frame_ms, list(state.mouse_pos), [int(b) for b in state.mouse_buttons], keys, encoded]
+        self.file.write(json.dumps(row, separators=(',', ':')) + '\n')
+        self.frames += 1
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class Replay:
+    """A recording loaded back for playback."""
+
+    def __init__(self, path):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            self.header = json.loads(f.readline())
+            if self.header.get('version') != FORMAT_VERSION:
+                raise ValueError(f'unsupported recording version {self.header.get("version")}')
+            self.frames = [json.loads(line) for line in f if line.strip()]
+        self.seed = self.header['seed']
+        self.sim_hz = self.header['sim_hz']
+        self.render_size = tuple(self.header['render_size'])
+
+    def restore_saves(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        for name, text in self.header['saves'].items():
+            with open(os.path.join(directory, name), 'w') as f:
+                f.write(text)
+
+
+class ReplayInput(InputState):
+    """InputState filled from recorded frames instead of pygame."""
+
+    def capture(self):
+        pass
+
+    def apply(self, frame):
+        frame_ms, mouse_pos, buttons, keys, events = frame
+        self.mouse_pos = tuple(mouse_pos)
+        self.mouse_buttons = tuple(bool(b) for b in buttons)
+        held = [False] * len(pygame.key.get_pressed())
+        for i in keys:
+            held[i] = True
+        self.keys = pygame.key.ScancodeWrapper(held)
+        return frame_ms, [_decode_event(e) for e in events]
@@ -0,0 +1,19 @@
+import random
+
+
+class SessionRNG:
+    """Seeded randomness for one game session.
+
+    Each system draws from its own named stream derived from the session seed,
+    so extra draws in one place don't shift the numbers another place sees.
+    """
+
+    def __init__(self, seed=None):
+        self.seed = seed if seed is not None else random.SystemRandom().randrange(2 ** 32)
+        self.streams = {}
+
+    def stream(self, name):
+        rng = self.streams.get(name)
+        if rng is None:
+            rng = self.streams[name] = random.Random(f'{self.seed}:{name}')
+        return rng
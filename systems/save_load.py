@@ -1,140 +1,836 @@
-import json, os
+import json, logging, os, threading, queue, time
 from datetime import datetime
+from systems import backups, slot_preview
+from systems.profiler import profiler
+
+log = logging.getLogger(__name__)
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 SAVE_DIR = os.path.join(ROOT, 'saves')
 META_FILE = os.path.join(SAVE_DIR, 'meta.json')
 LEGACY_FILE = os.path.join(ROOT, 'save.json')
+HISTORY_DIR = os.path.join(SAVE_DIR, 'history')
 DEFAULT_SLOT_DATA = {
     "inventory": [],
     "base": {"placed_structures": [], "player_pos": [400, 300]},
     "raid": {"noise": 0, "weather": "clear"}
 }
+# slots every fresh meta.json starts with; more are created on demand
+DEFAULT_SLOT_COUNT = 3
+# stack size used when migrating flat inventory lists
+INVENTORY_MAX_STACK = 100
+# seconds a dirty section may stay in memory before the session writes it out
+FLUSH_INTERVAL = 15.0
+# journal size at which the writer folds it into a fresh snapshot
+JOURNAL_COMPACT_BYTES = 256 * 1024
 
 os.makedirs(SAVE_DIR, exist_ok=True)
 
 def _slot_file(idx):
     return os.path.join(SAVE_DIR, f'save_slot{idx}.json')
 
+def _journal_file(idx):
+    return os.path.join(SAVE_DIR, f'save_slot{idx}.journal')
+
+def _summary_file(idx):
+    return os.path.join(SAVE_DIR, f'save_slot{idx}.summary.json')
+
+def _thumb_file(idx):
+    return os.path.join(SAVE_DIR, f'save_slot{idx}.thumb.png')
+
+def _history_dir(idx):
+    return os.path.join(HISTORY_DIR, f'slot{idx}')
+
+def _checkpoint(slot_index, data):
+    # keep a rolling, delta-compressed backup of the slot
+    backups.checkpoint(_history_dir(slot_index), data)
+    backups.enforce_cap(HISTORY_DIR)
+
+def _default_slot_data():
+    return json.loads(json.dumps(DEFAULT_SLOT_DATA))
+
 def _load_json(path, default):
     try:
         with open(path, 'r') as f:
             return json.load(f)
+    except FileNotFoundError:
+        return default
     except Exception:
+        log.warning('could not read %s', path, exc_info=True)
         return default
 
+def _save_text(path, text):
+    # write to a temp file and rename over the target so a crash never leaves a torn file
+    tmp = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
 def _save_json(path, data):
-    with open(path, 'w') as f:
-        json.dump(data, f)
-
-def _ensure_meta():
-    meta = _load_json(META_FILE, {
-        "slots": {"1": {"name": "", "exists": False, "last_played": None},
-                  "2": {"name": "", "exists": False, "last_played": None},
-                  "3": {"name": "", "exists": False, "last_played": None}},
+    _save_text(path, json.dumps(data))
+
+def _empty_slot():
+    return {"name": "", "exists": False, "last_played": None}
+
+def _default_meta():
+    return {
+        "slots": {str(i): _empty_slot() for i in range(1, DEFAULT_SLOT_COUNT + 1)},
         "active_slot": None
-    })
-    _save_json(META_FILE, meta)
-    return meta
+    }
+
+def _slot_entry(meta, slot_index):
+    return meta['slots'].setdefault(str(slot_index), _empty_slot())
+
+
+class _MetaCache:
+    """In-process copy of meta.json, revalidated against the file's mtime and size.
+
+    Reading never touches the disk beyond a stat(); only _write_meta() writes.
+    Writes are queued on the save writer behind any journal writes, and until
+    the last queued one has landed the cached copy is newer than the file, so
+    it is served without a stat.
+    """
+
+    def __init__(self):
+        self.meta = None
+        self.stamp = None
+        # bumped whenever the cached dict is replaced or changed, for _SlotIndex
+        self.version = 0
+        # meta writes queued on the writer thread that are not on disk yet
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            st = os.stat(META_FILE)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def read(self):
+        with self.lock:
+            if self.meta is not None and (self.in_flight or self._stat() == self.stamp):
+                return self.meta
+            stamp = self._stat()
+            meta = _load_json(META_FILE, None) if stamp is not None else None
+            if not isinstance(meta, dict) or 'slots' not in meta:
+                meta = _default_meta()
+            self.meta, self.stamp = meta, stamp
+            self.version += 1
+            return meta
+
+    def write(self, meta):
+        with self.lock:
+            self.meta, self.stamp = meta, None
+            self.in_flight += 1
+            self.version += 1
+        session._ensure_writer().submit('meta', META_FILE, json.dumps(meta))
+
+    def store(self, path, text):
+        # writer thread side of write(); the stamp is only trusted again once
+        # no other meta write is queued behind this one
+        try:
+            _save_text(path, text)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+                if not self.in_flight:
+                    self.stamp = self._stat()
+
+
+class _SlotIndex:
+    """Lookup tables over meta['slots'], rebuilt only when the metadata changes."""
+
+    def __init__(self):
+        self.version = None
+        self.by_id = {}
+        self.by_index = []
+        self.by_last_played = []
+
+    def sync(self):
+        meta = _meta_cache.read()
+        if self.version == _meta_cache.version:
+            return self
+        by_id = {}
+        for key, info in meta['slots'].items():
+            try:
+                by_id[int(key)] = info
+            except ValueError:
+                continue
+        self.by_id = by_id
+        self.by_index = sorted(by_id)
+        # existing slots first, most recently played first, then by id (sorts are stable)
+        recent = sorted(self.by_index, key=lambda i: by_id[i].get('last_played') or '', reverse=True)
+        recent.sort(key=lambda i: not by_id[i].get('exists'))
+        self.by_last_played = recent
+        self.version = _meta_cache.version
+        return self
+
+
+_meta_cache = _MetaCache()
+_slot_index = _SlotIndex()
+_legacy_checked = False
+
+def _read_meta():
+    # shared cached dict; mutate it only right before _write_meta()
+    return _meta_cache.read()
+
+def _write_meta(meta):
+    _meta_cache.write(meta)
+
+def _apply_record(data, rec):
+    path = rec['path']
+    target = data
+    for key in path[:-1]:
+        target = target[key]
+    op = rec['op']
+    if op == 'set':
+        target[path[-1]] = rec['value']
+    elif op == 'append':
+        target[path[-1]].append(rec['value'])
+    elif op == 'extend':
+        target[path[-1]].extend(rec['value'])
+    elif op == 'remove':
+        del target[path[-1]][rec['index']]
+
+def _read_journal(slot_index):
+    records = []
+    try:
+        with open(_journal_file(slot_index), 'r') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # torn tail from a crash mid-append
+                    continue
+    except FileNotFoundError:
+        pass
+    return records
+
+def _repair_journal(slot_index):
+    # cut a torn last line so new records do not get glued onto it
+    path = _journal_file(slot_index)
+    try:
+        with open(path, 'rb+') as f:
+            raw = f.read()
+            if raw and not raw.endswith(b'\n'):
+                f.truncate(raw.rfind(b'\n') + 1)
+    except FileNotFoundError:
+        pass
+
+def _pack_inventory(stacks):
+    # accepts ordered stacks, already packed stacks, legacy item names, or a mix:
+    # stacks keep their order and the legacy names follow, grouped into stacks
+    counts = {}
+    for it in stacks:
+        if isinstance(it, str):
+            counts[it] = counts.get(it, 0) + 1
+    stacks = [st for st in stacks if isinstance(st, dict)]
+    if all('slot' in st for st in stacks):
+        stacks = sorted(stacks, key=lambda st: st['slot'])
+    for it, qty in counts.items():
+        while qty > 0:
+            take = min(qty, INVENTORY_MAX_STACK)
+            stacks.append({"item": it, "qty": take})
+            qty -= take
+    packed = []
+    for st in stacks:
+        if st.get('qty', 0) > 0:
+            packed.append({"item": st['item'], "qty": int(st['qty']), "slot": len(packed)})
+    return packed
+
+def _migrate_inventory(data):
+    inv = data.get('inventory') or []
+    if all(isinstance(st, dict) and 'slot' in st for st in inv):
+        return False
+    data['inventory'] = _pack_inventory(inv)
+    return True
+
+def _read_slot(slot_index):
+    data = _load_json(_slot_file(slot_index), None)
+    if not isinstance(data, dict):
+        data = _default_slot_data()
+    seq = data.pop('journal_seq', 0)
+    for k,v in _default_slot_data().items():
+        if k not in data:
+            data[k] = v
+    for rec in _read_journal(slot_index):
+        if rec.get('seq', 0) <= seq:
+            continue
+        try:
+            _apply_record(data, rec)
+        except (KeyError, IndexError, TypeError):
+            continue
+        seq = rec['seq']
+    migrated = _migrate_inventory(data)
+    return data, seq, migrated
+
+
+class _Writer:
+    """Background thread that owns all slot journal and snapshot writes.
+
+    It keeps its own replica of every slot it has journaled to, so compaction
+    into a snapshot never has to copy state from the main loop. Failed journal,
+    compaction and meta jobs are kept, with the first error, until the session
+    takes them back to retry and report.
+    """
+
+    # jobs whose failure loses progress; the rest are logged and dropped
+    RETRIED = ('journal', 'compact', 'meta')
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.shadows = {}
+        self.lock = threading.Lock()
+        self.failed = []
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='save-writer', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                kind = job[0]
+                if kind == 'journal' and self._held(job[1]):
+                    # an earlier append to this slot failed; later ones wait
+                    # behind it so the journal stays in sequence order
+                    with self.lock:
+                        self.failed.append(job)
+                    continue
+                start = time.perf_counter()
+                if kind == 'meta':
+                    _meta_cache.store(job[1], job[2])
+                elif kind == 'journal':
+                    self._append(job[1], job[2])
+                elif kind == 'compact':
+                    self._compact(job[1])
+                elif kind == 'preview':
+                    self._preview(job[1])
+                elif kind == 'drop':
+                    self.shadows.pop(job[1], None)
+                profiler.add_background(f'save_load.writer.{kind}', (time.perf_counter() - start) * 1000)
+            except Exception as e:
+                log.exception('save writer: %s job failed', job[0])
+                self._fail(job, e)
+            finally:
+                self.queue.task_done()
+
+    def _held(self, slot_index):
+        with self.lock:
+            return any(j[0] == 'journal' and j[1] == slot_index for j in self.failed)
+
+    def _fail(self, job, error):
+        if job[0] == 'journal':
+            # rebuilt from disk on retry, whatever part of the append landed
+            self.shadows.pop(job[1], None)
+        if job[0] in self.RETRIED:
+            with self.lock:
+                self.failed.append(job)
+                if self.error is None:
+                    self.error = error
+
+    def take_failures(self):
+        # failed jobs in submission order and the first error, clearing both
+        with self.lock:
+            jobs, error = self.failed, self.error
+            self.failed, self.error = [], None
+        return jobs, error
+
+    def _shadow(self, slot_index):
+        shadow = self.shadows.get(slot_index)
+        if shadow is None:
+            _repair_journal(slot_index)
+            data, seq, _ = _read_slot(slot_index)
+            try:
+                size = os.path.getsize(_journal_file(slot_index))
+            except OSError:
+                size = 0
+            shadow = self.shadows[slot_index] = {'data': data, 'seq': seq, 'bytes': size}
+        return shadow
+
+    def _append(self, slot_index, lines):
+        shadow = self._shadow(slot_index)
+        with open(_journal_file(slot_index), 'a') as f:
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        for line in lines.splitlines():
+            rec = json.loads(line)
+            # a retried append may repeat records the shadow already read back
+            if rec['seq'] <= shadow['seq']:
+                continue
+            _apply_record(shadow['data'], rec)
+            shadow['seq'] = rec['seq']
+        shadow['bytes'] += len(lines)
+        if shadow['bytes'] >= JOURNAL_COMPACT_BYTES:
+            # its own job, so a failed compaction never replays this append
+            self.submit('compact', slot_index)
+
+    def _preview(self, slot_index):
+        slot_preview.write_preview(self._shadow(slot_index)['data'], _summary_file(slot_index), _thumb_file(slot_index))
+
+    def _compact(self, slot_index):
+        shadow = self._shadow(slot_index)
+        if not shadow['bytes']:
+            return
+        snapshot = dict(shadow['data'])
+        snapshot['journal_seq'] = shadow['seq']
+        _save_json(_slot_file(slot_index), snapshot)
+        # records up to journal_seq are now in the snapshot; a crash before this
+        # truncate just leaves records that replay skips
+        open(_journal_file(slot_index), 'w').close()
+        shadow['bytes'] = 0
+        _checkpoint(slot_index, shadow['data'])
+        self._preview(slot_index)
+
+    def submit(self, *job):
+        self.queue.put(job)
+
+    def wait(self):
+        self.queue.join()
+
+    def stop(self):
+        self.queue.put(None)
+        self.thread.join()
+
+
+class SaveSession:
+    """In-memory copy of the active slot.
+
+    Scenes mutate the session through the save_* helpers below. Each change is
+    applied in memory and queued as a small journal record; flush() hands the
+    pending records to the writer thread, and the game loop triggers it on a
+    debounce interval, on scene switch and on quit.
+    """
+
+    def __init__(self):
+        self.slot = None
+        self.data = None
+        self.seq = 0
+        self.pending = []
+        self.dirty_since = None
+        self._writer = None
+        # flushed since the slot's summary and thumbnail were last queued
+        self.preview_stale = False
+        # bumped whenever self.data is replaced, so caches built from it can tell
+        self.generation = 0
+
+    def _ensure_writer(self):
+        if self._writer is None:
+            self._writer = _Writer()
+        return self._writer
+
+    @profiler.timed('save_load.open')
+    def open(self, slot_index):
+        if self.data is not None and slot_index == self.slot:
+            return self.data
+        self.flush()
+        self.refresh_preview()
+        self.wait()
+        self.slot = slot_index
+        self.generation += 1
+        migrated = False
+        if slot_index is None:
+            self.data, self.seq = _default_slot_data(), 0
+        else:
+            self.data, self.seq, migrated = _read_slot(slot_index)
+        self.pending = []
+        self.dirty_since = None
+        if migrated:
+            self.record('set', ['inventory'], self.data['inventory'])
+        return self.data
+
+    def get(self):
+        if self.data is None:
+            return self.open(_read_meta().get('active_slot'))
+        return self.data
+
+    def discard(self, slot_index=None):
+        # drop the cached copy without writing it, e.g. after the slot file was replaced
+        if slot_index is None or slot_index == self.slot:
+            self.wait()
+            self.slot = None
+            self.data = None
+            self.generation += 1
+            self.pending = []
+            self.dirty_since = None
+        if self._writer is not None and slot_index is not None:
+            self._writer.submit('drop', slot_index)
+            self._writer.wait()
+
+    @property
+    def dirty(self):
+        return bool(self.pending)
+
+    def record(self, op, path, value=None, index=None):
+        data = self.get()
+        rec = {'op': op, 'path': list(path)}
+        if op == 'remove':
+            rec['index'] = index
+        else:
+            rec['value'] = value
+        _apply_record(data, rec)
+        if op != 'remove':
+            # the journal keeps its own copy; the caller may keep mutating value
+            rec['value'] = json.loads(json.dumps(value))
+        if op == 'set':
+            self._coalesce(rec['path'])
+        if not self.pending:
+            self.dirty_since = time.monotonic()
+        self.pending.append(rec)
+
+    def _coalesce(self, path):
+        # a later set of the same path supersedes an earlier one, as long as
+        # nothing in between touched that path or one of its ancestors
+        n = len(path)
+        for i in range(len(self.pending) - 1, -1, -1):
+            other = self.pending[i]['path']
+            m = min(n, len(other))
+            if other[:m] != path[:m]:
+                continue
+            if self.pending[i]['op'] == 'set' and other == path:
+                del self.pending[i]
+            return
+
+    def tick(self, now=None):
+        if not self.pending:
+            return False
+        now = time.monotonic() if now is None else now
+        if now - self.dirty_since >= FLUSH_INTERVAL:
+            self.flush()
+            return True
+        return False
+
+    def _retry_failed(self):
+        # requeue what the writer could not write, ahead of anything new;
+        # returns the first error it hit
+        if self._writer is None:
+            return None
+        jobs, error = self._writer.take_failures()
+        for job in jobs:
+            if job[0] != 'meta':
+                self._writer.submit(*job)
+        if any(job[0] == 'meta' for job in jobs):
+            # the cache still holds the copy that did not get written
+            _write_meta(_read_meta())
+        return error
+
+    @profiler.timed('save_load.flush')
+    def flush(self):
+        # raises the first writer failure since the last flush, after queueing
+        # the failed writes again behind nothing newer
+        error = self._retry_failed()
+        if self.pending and self.data is not None:
+            self._flush_pending()
+        if error is not None:
+            raise error
+
+    def _flush_pending(self):
+        meta = _read_meta()
+        slot_index = self.slot
+        if slot_index is None:
+            slot_index = meta.get('active_slot') or 1
+            self.slot = slot_index
+        meta['active_slot'] = slot_index
+        entry = _slot_entry(meta, slot_index)
+        entry['exists'] = True
+        entry['last_played'] = datetime.now().isoformat()
+        lines = []
+        for rec in self.pending:
+            self.seq += 1
+            rec['seq'] = self.seq
+            lines.append(json.dumps(rec, separators=(',', ':')))
+        writer = self._ensure_writer()
+        writer.submit('journal', slot_index, '\n'.join(lines) + '\n')
+        _write_meta(meta)
+        self.pending = []
+        self.dirty_since = None
+        self.preview_stale = True
+
+    def refresh_preview(self):
+        # appends leave the preview alone; callers ask for it at quieter points
+        # such as a scene exit, and compaction refreshes it on its own
+        if self.preview_stale and self.slot is not None:
+            self._ensure_writer().submit('preview', self.slot)
+            self.preview_stale = False
+
+    def wait(self):
+        if self._writer is not None:
+            self._writer.wait()
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            if self.slot is not None:
+                self._writer.submit('compact', self.slot)
+            self._writer.stop()
+            _, error = self._writer.take_failures()
+            self._writer = None
+            if error is not None:
+                raise error
+
+
+session = SaveSession()
+previews = slot_preview.PreviewLoader()
+
+
+def _sync_session():
+    # push pending session writes to disk before touching slot/meta files directly
+    session.flush()
+    session.wait()
+
+def _write_snapshot(slot_index, data):
+    _sync_session()
+    _save_json(_slot_file(slot_index), data)
+    try:
+        os.remove(_journal_file(slot_index))
+    except FileNotFoundError:
+        pass
+    session.discard(slot_index)
+    session._ensure_writer().submit('preview', slot_index)
+
+def use_save_dir(path):
+    # point all slot, meta and history files at another directory, e.g. a
+    # scratch directory for benchmarks; legacy migration is skipped there
+    global SAVE_DIR, META_FILE, HISTORY_DIR, _legacy_checked
+    _sync_session()
+    session.discard()
+    SAVE_DIR = path
+    META_FILE = os.path.join(SAVE_DIR, 'meta.json')
+    HISTORY_DIR = os.path.join(SAVE_DIR, 'history')
+    os.makedirs(SAVE_DIR, exist_ok=True)
+    _meta_cache.__init__()
+    _slot_index.__init__()
+    previews.clear()
+    _legacy_checked = True
+
+def pack_structure(s):
+    rect = s.get('rect')
+    rdict = {'x': int(getattr(rect,'x',0)), 'y': int(getattr(rect,'y',0)), 'w': int(getattr(rect,'w',40)), 'h': int(getattr(rect,'h',40))}
+    return {'type': s.get('type','Unknown'), 'rect': rdict}
 
 def migrate_legacy_if_needed():
-    meta = _ensure_meta()
+    # called once at startup; later calls are no-ops
+    global _legacy_checked
+    if _legacy_checked:
+        return
+    _legacy_checked = True
+    meta = _read_meta()
     has_any = any(s.get('exists') for s in meta['slots'].values())
     if os.path.exists(LEGACY_FILE) and not has_any:
-        data = _load_json(LEGACY_FILE, DEFAULT_SLOT_DATA)
-        _save_json(_slot_file(1), data)
+        data = _load_json(LEGACY_FILE, _default_slot_data())
+        _migrate_inventory(data)
+        _write_snapshot(1, data)
         meta['slots']['1'] = {"name": "Legacy", "exists": True, "last_played": datetime.now().isoformat()}
         meta['active_slot'] = 1
-        _save_json(META_FILE, meta)
+        _write_meta(meta)
+
+def _slot_info(i, info):
+    return {'index': i, 'name': info.get('name',''), 'exists': bool(info.get('exists')), 'last_played': info.get('last_played')}
 
 def list_slots():
-    migrate_legacy_if_needed()
-    meta = _ensure_meta()
-    slots = []
-    for i in [1,2,3]:
-        info = meta['slots'][str(i)]
-        slots.append({'index': i, 'name': info.get('name',''), 'exists': bool(info.get('exists')), 'last_played': info.get('last_played')})
-    return slots
+    index = _slot_index.sync()
+    return [_slot_info(i, index.by_id[i]) for i in index.by_index]
+
+def list_slots_page(page, per_page, order='index'):
+    # returns (slots on that page, total slot count); order is 'index' or 'last_played'
+    index = _slot_index.sync()
+    ids = index.by_last_played if order == 'last_played' else index.by_index
+    start = max(0, page) * per_page
+    return [_slot_info(i, index.by_id[i]) for i in ids[start:start + per_page]], len(ids)
+
+def get_slot(slot_index):
+    info = _slot_index.sync().by_id.get(slot_index)
+    return _slot_info(slot_index, info) if info is not None else None
+
+def request_preview(slot_index):
+    # queue a background load of the slot's summary and thumbnail; slots saved
+    # before previews existed get them built from the save on that thread
+    previews.request(slot_index, _summary_file(slot_index), _thumb_file(slot_index),
+                     lambda: _read_slot(slot_index)[0])
+
+def get_preview(slot_index):
+    # (summary, thumbnail surface) once loaded, None while still pending
+    return previews.get(slot_index)
+
+def slot_count():
+    return len(_slot_index.sync().by_id)
+
+def next_free_slot():
+    # lowest id without a save; a brand new id when every slot is taken
+    index = _slot_index.sync()
+    for i in index.by_index:
+        if not index.by_id[i].get('exists'):
+            return i
+    return (index.by_index[-1] if index.by_index else 0) + 1
 
 def new_game(slot_index, name, overwrite=False):
-    migrate_legacy_if_needed()
-    meta = _ensure_meta()
-    if meta['slots'][str(slot_index)]['exists'] and not overwrite:
-        return False
-    data = DEFAULT_SLOT_DATA.copy()
-    _save_json(_slot_file(slot_index), data)
+    meta = _read_meta()
+    if _slot_entry(meta, slot_index)['exists']:
+        if not overwrite:
+            return False
+        _sync_session()
+        _checkpoint(slot_index, _read_slot(slot_index)[0])
+    _write_snapshot(slot_index, _default_slot_data())
     meta['slots'][str(slot_index)] = {'name': name, 'exists': True, 'last_played': datetime.now().isoformat()}
     meta['active_slot'] = slot_index
-    _save_json(META_FILE, meta)
+    _write_meta(meta)
+    session.open(slot_index)
     return True
 
 def set_active_slot(slot_index):
-    meta = _ensure_meta()
-    if meta['slots'][str(slot_index)]['exists']:
+    _sync_session()
+    meta = _read_meta()
+    entry = meta['slots'].get(str(slot_index))
+    if entry and entry['exists']:
         meta['active_slot'] = slot_index
-        meta['slots'][str(slot_index)]['last_played'] = datetime.now().isoformat()
-        _save_json(META_FILE, meta)
+        entry['last_played'] = datetime.now().isoformat()
+        _write_meta(meta)
+        session.open(slot_index)
         return True
     return False
 
 def get_active_slot():
-    meta = _ensure_meta()
+    meta = _read_meta()
     return meta.get('active_slot')
 
 def load_save(slot_index=None):
-    migrate_legacy_if_needed()
-    meta = _ensure_meta()
-    if slot_index is None:
-        slot_index = meta.get('active_slot')
-    if slot_index is None:
-        return DEFAULT_SLOT_DATA.copy()
-    data = _load_json(_slot_file(slot_index), DEFAULT_SLOT_DATA)
-    for k,v in DEFAULT_SLOT_DATA.items():
-        if k not in data:
-            data[k] = v
-    return data
+    # the active slot is served from the session; treat the result as read-only
+    # and go through the save_* helpers to change it
+    if slot_index is None or slot_index == session.slot:
+        return session.get()
+    session.wait()
+    return _read_slot(slot_index)[0]
+
+def load_inventory(slot_index=None):
+    # ordered stacks; slot position is the list index
+    return [{"item": st['item'], "qty": st['qty']} for st in load_save(slot_index)['inventory']]
 
 def save_all(data, slot_index=None):
-    meta = _ensure_meta()
-    if slot_index is None:
-        slot_index = meta.get('active_slot') or 1
-        meta['active_slot'] = slot_index
-    _save_json(_slot_file(slot_index), data)
-    meta['slots'][str(slot_index)]['exists'] = True
-    meta['slots'][str(slot_index)]['last_played'] = datetime.now().isoformat()
-    _save_json(META_FILE, meta)
+    if slot_index is None or slot_index == session.slot:
+        for k, v in data.items():
+            session.record('set', [k], v)
+        session.flush()
+        return
+    meta = _read_meta()
+    _write_snapshot(slot_index, data)
+    entry = _slot_entry(meta, slot_index)
+    entry['exists'] = True
+    entry['last_played'] = datetime.now().isoformat()
+    _write_meta(meta)
+
+def save_inventory(stacks, slot_index=None):
+    packed = _pack_inventory(stacks)
+    if slot_index is not None and slot_index != session.slot:
+        data = load_save(slot_index)
+        data['inventory'] = packed
+        return save_all(data, slot_index)
+    if session.get()['inventory'] != packed:
+        session.record('set', ['inventory'], packed)
+
+def add_structure(structure, slot_index=None):
+    if slot_index is not None and slot_index != session.slot:
+        data = load_save(slot_index)
+        data['base']['placed_structures'].append(pack_structure(structure))
+        return save_all(data, slot_index)
+    session.record('append', ['base', 'placed_structures'], pack_structure(structure))
+
+def add_structures(structures, slot_index=None):
+    # many structures as one journal entry
+    packed = [pack_structure(s) for s in structures]
+    if slot_index is not None and slot_index != session.slot:
+        data = load_save(slot_index)
+        data['base']['placed_structures'].extend(packed)
+        return save_all(data, slot_index)
+    session.record('extend', ['base', 'placed_structures'], packed)
 
-def save_inventory(items_flat, slot_index=None):
-    data = load_save(slot_index)
-    data['inventory'] = list(items_flat)
-    save_all(data, slot_index)
+def remove_structure(index, slot_index=None):
+    if slot_index is not None and slot_index != session.slot:
+        data = load_save(slot_index)
+        del data['base']['placed_structures'][index]
+        return save_all(data, slot_index)
+    session.record('remove', ['base', 'placed_structures'], index=index)
 
 def save_base_state(player_pos=None, placed_structures=None, slot_index=None):
-    data = load_save(slot_index)
+    if slot_index is not None and slot_index != session.slot:
+        data = load_save(slot_index)
+        if player_pos is not None:
+            data['base']['player_pos'] = [int(player_pos[0]), int(player_pos[1])]
+        if placed_structures is not None:
+            data['base']['placed_structures'] = [pack_structure(s) for s in placed_structures]
+        return save_all(data, slot_index)
+    base = session.get()['base']
     if player_pos is not None:
-        data['base']['player_pos'] = [int(player_pos[0]), int(player_pos[1])]
+        pos = [int(player_pos[0]), int(player_pos[1])]
+        if base.get('player_pos') != pos:
+            session.record('set', ['base', 'player_pos'], pos)
     if placed_structures is not None:
-        packed = []
-        for s in placed_structures:
-            rect = s.get('rect')
-            rdict = {'x': int(getattr(rect,'x',0)), 'y': int(getattr(rect,'y',0)), 'w': int(getattr(rect,'w',40)), 'h': int(getattr(rect,'h',40))}
-            packed.append({'type': s.get('type','Unknown'), 'rect': rdict})
-        data['base']['placed_structures'] = packed
-    save_all(data, slot_index)
+        packed = [pack_structure(s) for s in placed_structures]
+        old = base['placed_structures']
+        if packed[:len(old)] == old:
+            if len(packed) > len(old):
+                session.record('extend', ['base', 'placed_structures'], packed[len(old):])
+        else:
+            session.record('set', ['base', 'placed_structures'], packed)
 
 def save_raid_state(noise=None, weather=None, slot_index=None):
-    data = load_save(slot_index)
-    if noise is not None:
-        data['raid']['noise'] = int(noise)
-    if weather is not None:
-        data['raid']['weather'] = str(weather)
-    save_all(data, slot_index)
+    if slot_index is not None and slot_index != session.slot:
+        data = load_save(slot_index)
+        if noise is not None:
+            data['raid']['noise'] = int(noise)
+        if weather is not None:
+            data['raid']['weather'] = str(weather)
+        return save_all(data, slot_index)
+    raid = session.get()['raid']
+    if noise is not None and raid.get('noise') != int(noise):
+        session.record('set', ['raid', 'noise'], int(noise))
+    if weather is not None and raid.get('weather') != str(weather):
+        session.record('set', ['raid', 'weather'], str(weather))
+
+def list_versions(slot_index):
+    # backups of the slot, oldest first: [{'id', 'created', 'bytes'}, ...]
+    return backups.list_versions(_history_dir(slot_index))
+
+def restore_version(slot_index, version_id, name=None):
+    data = backups.load_version(_history_dir(slot_index), version_id)
+    if data is None:
+        return False
+    meta = _read_meta()
+    entry = _slot_entry(meta, slot_index)
+    if entry['exists']:
+        # the state being replaced becomes a version too, so a restore can be undone
+        _sync_session()
+        _checkpoint(slot_index, _read_slot(slot_index)[0])
+    _write_snapshot(slot_index, data)
+    entry['exists'] = True
+    entry['name'] = name or entry.get('name') or f'Slot {slot_index}'
+    entry['last_played'] = datetime.now().isoformat()
+    _write_meta(meta)
+    return True
 
 def delete_slot(slot_index):
-    meta = _ensure_meta()
-    meta['slots'][str(slot_index)] = {"name": "", "exists": False, "last_played": None}
-    _save_json(META_FILE, meta)
-    try:
-        os.remove(_slot_file(slot_index))
-    except FileNotFoundError:
-        pass
+    _sync_session()
+    if os.path.exists(_slot_file(slot_index)) or os.path.exists(_journal_file(slot_index)):
+        # deleted slots stay restorable from their history, even ones whose
+        # changes only ever reached the journal
+        _checkpoint(slot_index, _read_slot(slot_index)[0])
+    session.discard(slot_index)
+    meta = _read_meta()
+    if slot_index > DEFAULT_SLOT_COUNT:
+        meta['slots'].pop(str(slot_index), None)
+    else:
+        meta['slots'][str(slot_index)] = _empty_slot()
+    if meta.get('active_slot') == slot_index:
+        meta['active_slot'] = None
+    _write_meta(meta)
+    previews.forget(slot_index)
+    for path in (_slot_file(slot_index), _journal_file(slot_index), _summary_file(slot_index), _thumb_file(slot_index)):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,133 @@
+import json, logging, os, threading, queue
+from datetime import datetime
+import pygame
+
+log = logging.getLogger(__name__)
+
+THUMB_SIZE = (96, 54)
+GROUND_COLOR = (45, 55, 45)
+PLAYER_COLOR = (0, 0, 255)
+STRUCTURE_COLORS = {
+    "Wall": (120, 120, 120),
+    "Door": (100, 80, 60),
+    "Workbench": (160, 100, 50),
+    "FarmPlot": (80, 150, 100),
+}
+
+
+def summarize(data):
+    items = {}
+    for st in data.get('inventory', []):
+        if isinstance(st, dict):
+            items[st['item']] = items.get(st['item'], 0) + st.get('qty', 0)
+    raid = data.get('raid', {})
+    return {
+        "items": items,
+        "item_total": sum(items.values()),
+        "structures": len(data.get('base', {}).get('placed_structures', [])),
+        "noise": raid.get('noise', 0),
+        "weather": raid.get('weather', 'clear'),
+        "saved_at": datetime.now().isoformat(),
+    }
+
+
+def render_thumbnail(data):
+    # fit the base's structures and the player into THUMB_SIZE
+    base = data.get('base', {})
+    rects = [s['rect'] for s in base.get('placed_structures', [])]
+    px, py = base.get('player_pos', [400, 300])
+    left, top = min([px] + [r['x'] for r in rects]), min([py] + [r['y'] for r in rects])
+    right = max([px + 40] + [r['x'] + r.get('w', 40) for r in rects])
+    bottom = max([py + 40] + [r['y'] + r.get('h', 40) for r in rects])
+    tw, th = THUMB_SIZE
+    scale = min(tw / max(1, right - left + 80), th / max(1, bottom - top + 80))
+    ox = (tw - (right - left) * scale) / 2 - left * scale
+    oy = (th - (bottom - top) * scale) / 2 - top * scale
+    surf = pygame.Surface(THUMB_SIZE)
+    surf.fill(GROUND_COLOR)
+    for s in base.get('placed_structures', []):
+        r = s['rect']
+        color = STRUCTURE_COLORS.get(s.get('type'), (80, 150, 100))
+        surf.fill(color, (int(ox + r['x'] * scale), int(oy + r['y'] * scale),
+                          max(1, int(r.get('w', 40) * scale)), max(1, int(r.get('h', 40) * scale))))
+    surf.fill(PLAYER_COLOR, (int(ox + px * scale), int(oy + py * scale), max(2, int(40 * scale)), max(2, int(40 * scale))))
+    return surf
+
+
+def write_preview(data, summary_path, thumb_path):
+    # runs on the save writer thread, from the writer's own copy of the slot
+    thumb = render_thumbnail(data)
+    tmp = f'{thumb_path}.{threading.get_ident()}.tmp.png'
+    pygame.image.save(thumb, tmp)
+    os.replace(tmp, thumb_path)
+    tmp = f'{summary_path}.{threading.get_ident()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(summarize(data), f)
+    os.replace(tmp, summary_path)
+
+
+class PreviewLoader:
+    """Loads slot summaries and thumbnails on a worker thread.
+
+    request() queues slots, get() returns (summary, thumbnail) once loaded or
+    None while it is still pending, so callers can draw a placeholder. A slot
+    whose files are missing is built first when request() is given the data.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.results = {}
+        self.stamps = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def _ensure_thread(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name='slot-previews', daemon=True)
+            self.thread.start()
+
+    def _run(self):
+        while True:
+            slot_index, summary_path, thumb_path, build = self.queue.get()
+            try:
+                stamp = os.stat(summary_path).st_mtime_ns
+            except OSError:
+                stamp = None
+            if stamp is None and build is not None:
+                try:
+                    write_preview(build(), summary_path, thumb_path)
+                    stamp = os.stat(summary_path).st_mtime_ns
+                except Exception:
+                    log.warning('could not build preview for slot %s', slot_index, exc_info=True)
+            if stamp is not None and stamp == self.stamps.get(slot_index):
+                continue
+            summary, thumb = None, None
+            if stamp is not None:
+                try:
+                    with open(summary_path, 'r') as f:
+                        summary = json.load(f)
+                    thumb = pygame.image.load(thumb_path)
+                except Exception:
+                    pass
+            with self.lock:
+                self.stamps[slot_index] = stamp
+                self.results[slot_index] = (summary, thumb)
+
+    def request(self, slot_index, summary_path, thumb_path, build=None):
+        # build: optional callable returning the slot's save data
+        self._ensure_thread()
+        self.queue.put((slot_index, summary_path, thumb_path, build))
+
+    def get(self, slot_index):
+        with self.lock:
+            return self.results.get(slot_index)
+
+    def forget(self, slot_index):
+        with self.lock:
+            self.results.pop(slot_index, None)
+            self.stamps.pop(slot_index, None)
+
+    def clear(self):
+        with self.lock:
+            self.results = {}
+            self.stamps = {}
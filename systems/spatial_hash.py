@@ -0,0 +1,106 @@
+import math
+import pygame
+
+CELL_SIZE = 64
+
+
+class SpatialHash:
+    """Uniform grid of buckets for proximity queries over rect-shaped objects.
+
+    Objects are dicts or any other instance, tracked by identity, each with a
+    rect that may span several cells. Queries only visit the cells they touch
+    and return objects in insertion order, so callers see the same order a
+    scan over their own list would give.
+    """
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        # id(obj) -> [obj, rect, cell keys, insertion order]
+        self.entries = {}
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, obj):
+        return id(obj) in self.entries
+
+    def _keys(self, rect):
+        cs = self.cell_size
+        return [(cx, cy)
+                for cy in range(rect.top // cs, (rect.bottom - 1) // cs + 1)
+                for cx in range(rect.left // cs, (rect.right - 1) // cs + 1)]
+
+    def clear(self):
+        self.cells = {}
+        self.entries = {}
+
+    def insert(self, obj, rect):
+        if id(obj) in self.entries:
+            self.move(obj, rect)
+            return
+        rect = pygame.Rect(rect)
+        keys = self._keys(rect)
+        self.entries[id(obj)] = [obj, rect, keys, self.counter]
+        self.counter += 1
+        for key in keys:
+            self.cells.setdefault(key, {})[id(obj)] = obj
+
+    def move(self, obj, rect):
+        entry = self.entries[id(obj)]
+        rect = pygame.Rect(rect)
+        keys = self._keys(rect)
+        if keys != entry[2]:
+            self._unlink(obj, entry[2])
+            for key in keys:
+                self.cells.setdefault(key, {})[id(obj)] = obj
+            entry[2] = keys
+        entry[1] = rect
+
+    def remove(self, obj):
+        entry = self.entries.pop(id(obj), None)
+        if entry is not None:
+            self._unlink(obj, entry[2])
+
+    def _unlink(self, obj, keys):
+        for key in keys:
+            bucket = self.cells[key]
+            del bucket[id(obj)]
+            if not bucket:
+                del self.cells[key]
+
+    def _near(self, rect):
+        # entries in the cells rect touches, each once, in insertion order
+        found = {}
+        for key in self._keys(rect):
+            for oid in self.cells.get(key, ()):
+                found[oid] = self.entries[oid]
+        return sorted(found.values(), key=lambda e: e[3])
+
+    def query_rect(self, rect):
+        rect = pygame.Rect(rect)
+        return [e[0] for e in self._near(rect) if e[1].colliderect(rect)]
+
+    def query_radius(self, center, radius):
+        # objects whose rect center lies within radius of center
+        x, y = center
+        box = pygame.Rect(math.floor(x - radius), math.floor(y - radius), 0, 0)
+        box.size = (math.ceil(x + radius) - box.x + 1, math.ceil(y + radius) - box.y + 1)
+        hits = []
+        for obj, rect, _, _ in self._near(box):
+            dx, dy = rect.centerx - x, rect.centery - y
+            if math.sqrt(dx * dx + dy * dy) <= radius:
+                hits.append(obj)
+        return hits
+
+    def query_cone(self, origin, angle, spread, radius):
+        # objects whose rect center is within radius and within spread/2 degrees of angle
+        x, y = origin
+        hits = []
+        for obj in self.query_radius(origin, radius):
+            cx, cy = self.entries[id(obj)][1].center
+            ang = math.degrees(math.atan2(cy - y, cx - x))
+            if abs((ang - angle + 180) % 360 - 180) <= spread / 2:
+                hits.append(obj)
+        return hits
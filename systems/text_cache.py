@@ -0,0 +1,65 @@
+from collections import OrderedDict
+import pygame
+
+# upper bound for the pixel data of cached text surfaces
+MAX_CACHE_BYTES = 8 * 1024 * 1024
+
+_fonts = {}
+
+
+def get_font(size, name=None):
+    # one Font per (name, size) for the whole game instead of one per widget
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.SysFont(name, size)
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (font, text, color, antialias).
+
+    Returned surfaces are shared between callers and must not be drawn on.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surf = self.entries.get(key)
+        if surf is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = font.render(text, antialias, color)
+        size = surf.get_pitch() * surf.get_height()
+        self.entries[key] = surf
+        self.bytes += size
+        while self.bytes > self.max_bytes and len(self.entries) > 1:
+            _, old = self.entries.popitem(last=False)
+            self.bytes -= old.get_pitch() * old.get_height()
+            self.evictions += 1
+        return surf
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self.entries), 'bytes': self.bytes, 'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'hit_rate': self.hits / lookups if lookups else 0.0}
+
+
+text_cache = TextCache()
+
+
+def render(font, text, color, antialias=True):
+    return text_cache.render(font, text, color, antialias)
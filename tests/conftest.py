@@ -0,0 +1,30 @@
+import os
+import sys
+
+import pytest
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench.scenarios import ScriptedInput
+from main import Game
+from systems import save_load
+
+
+@pytest.fixture
+def save_dir(tmp_path):
+    # every test gets its own empty save directory and a fresh session
+    save_load.use_save_dir(str(tmp_path))
+    yield tmp_path
+    save_load._sync_session()
+    save_load.session.discard()
+
+
+@pytest.fixture
+def game(save_dir):
+    # headless game on a fresh slot 1, with input set by the test
+    save_load.new_game(1, 'test')
+    game = Game(seed=1, render_size=(640, 360))
+    game.input = ScriptedInput()
+    return game
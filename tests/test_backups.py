@@ -0,0 +1,58 @@
+import os
+
+from systems import backups
+
+
+def _world(n):
+    return {'player': {'pos': [n, 2 * n]}, 'base': {'placed_structures': [{'type': 'Wall', 'x': i} for i in range(n)]},
+            'inventory': [{'item': 'Wood', 'qty': n}], 'raid': {'noise': n % 3}}
+
+
+def test_diff_patch_round_trip():
+    cases = [
+        ({'a': 1, 'b': [1, 2, 3]}, {'a': 2, 'c': None, 'b': [1, 2, 3, 4]}),
+        ([1, 2, 3, 4], [1, 2]),
+        ([{'q': i} for i in range(8)], [{'q': i if i != 5 else -1} for i in range(8)]),
+        ({'x': {'y': [1]}}, 'replaced'),
+        (_world(3), _world(7)),
+        (_world(7), _world(3)),
+    ]
+    for old, new in cases:
+        assert backups.patch(old, backups.diff(old, new)) == new
+    assert backups.diff(_world(4), _world(4)) is None
+
+
+def test_versions_restore_and_stop_at_max_versions(tmp_path, monkeypatch):
+    monkeypatch.setattr(backups, 'MAX_VERSIONS', 5)
+    slot_dir = str(tmp_path / 'slot1')
+    ids = [backups.checkpoint(slot_dir, _world(n)) for n in range(1, 9)]
+    # unchanged data adds no version
+    assert backups.checkpoint(slot_dir, _world(8)) is None
+    kept = [v['id'] for v in backups.list_versions(slot_dir)]
+    assert kept == ids[-5:]
+    for vid, n in zip(ids[-5:], range(4, 9)):
+        assert backups.load_version(slot_dir, vid) == _world(n)
+    assert backups.load_version(slot_dir, ids[0]) is None
+    files = sorted(os.listdir(slot_dir))
+    assert files == sorted(['index.json', f'v{ids[-1]}.full.z'] + [f'v{v}.delta.z' for v in ids[-5:-1]])
+
+
+def test_cap_drops_the_oldest_patches_across_slots(tmp_path):
+    history = str(tmp_path)
+    for slot in ('slot1', 'slot2'):
+        for n in range(1, 6):
+            backups.checkpoint(os.path.join(history, slot), _world(n * 10))
+    sizes = {slot: sum(v['bytes'] for v in backups.list_versions(os.path.join(history, slot)))
+             for slot in ('slot1', 'slot2')}
+    cap = sum(sizes.values()) // 2
+    backups.enforce_cap(history, cap)
+    left = {slot: backups.list_versions(os.path.join(history, slot)) for slot in sizes}
+    assert sum(v['bytes'] for versions in left.values() for v in versions) <= cap
+    for slot, versions in left.items():
+        # the newest full copy always stays and still restores
+        assert versions
+        slot_dir = os.path.join(history, slot)
+        assert backups.load_version(slot_dir, versions[0]['id']) is not None
+        assert backups.load_version(slot_dir, versions[-1]['id']) == _world(50)
+    # slot1 was written first, so its versions were the oldest to go
+    assert len(left['slot1']) <= len(left['slot2'])
@@ -0,0 +1,29 @@
+import json
+
+from bench import run
+
+
+def test_same_machine_compares_directly():
+    baseline = {'machine': run.machine_id(), 'calibration_ms': 10.0, 'scenarios': {}}
+    assert run.speed_ratio(baseline, 20.0) == 1.0
+
+
+def test_other_machine_scales_by_calibration():
+    baseline = {'machine': {'machine': 'other'}, 'calibration_ms': 10.0,
+                'scenarios': {'raid': {'ticks_per_sec': 60.0, 'p50_ms': 15.0}}}
+    ratio = run.speed_ratio(baseline, 20.0)
+    assert ratio == 2.0
+    # half the speed on a machine twice as slow is no regression
+    results = {'raid': {'ticks_per_sec': 30.0, 'p50_ms': 30.0}}
+    assert run.compare(results, baseline['scenarios'], 0.25, ratio) == []
+    results = {'raid': {'ticks_per_sec': 20.0, 'p50_ms': 45.0}}
+    assert {m for _, m, _, _ in run.compare(results, baseline['scenarios'], 0.25, ratio)} == {'ticks_per_sec', 'p50_ms'}
+
+
+def test_old_baseline_format_loads(tmp_path):
+    path = tmp_path / 'baseline.json'
+    path.write_text(json.dumps({'menu_idle': {'ticks_per_sec': 100.0}}))
+    baseline = run.load_baseline(str(path))
+    assert baseline['scenarios'] == {'menu_idle': {'ticks_per_sec': 100.0}}
+    assert run.speed_ratio(baseline, 5.0) == 1.0
+    assert run.load_baseline(str(tmp_path / 'missing.json')) == {'scenarios': {}}
@@ -0,0 +1,28 @@
+import json
+
+from systems import config
+from systems.config import MIN_RENDER_SIZE, RENDER_SCALES, RESOLUTIONS, render_size
+
+
+def test_render_size_keeps_aspect_ratio():
+    for resolution in RESOLUTIONS:
+        for scale in RENDER_SCALES:
+            w, h = render_size({'resolution': resolution, 'render_scale': scale})
+            assert w >= MIN_RENDER_SIZE[0] and h >= MIN_RENDER_SIZE[1]
+            # within the one pixel of rounding on either axis
+            assert abs(w * resolution[1] - h * resolution[0]) <= max(resolution), (resolution, scale, (w, h))
+
+
+def test_every_render_scale_gives_its_own_size():
+    for resolution in RESOLUTIONS:
+        widths = [render_size({'resolution': resolution, 'render_scale': s})[0] for s in RENDER_SCALES]
+        assert widths == sorted(set(widths)), (resolution, widths)
+
+
+def test_load_config_snaps_to_an_offered_scale(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    monkeypatch.setattr(config, 'CFG_FILE', str(path))
+    path.write_text(json.dumps({'render_scale': 0.5}))
+    assert config.load_config()['render_scale'] == 0.75
+    path.write_text(json.dumps({'resolution': [1280, 720]}))
+    assert config.load_config()['render_scale'] == config.DEFAULT_CFG['render_scale']
@@ -0,0 +1,64 @@
+import numpy as np
+import pygame
+
+from systems.flowfield import UNREACHABLE, FlowField
+from systems.occupancy import OccupancyGrid
+
+# a wall across the middle column with one gap at the bottom
+WALKABLE = np.array([
+    [1, 1, 0, 1, 1],
+    [1, 1, 0, 1, 1],
+    [1, 1, 0, 1, 1],
+    [1, 1, 1, 1, 1],
+], bool)
+
+
+def test_distances_go_around_walls():
+    field = FlowField(WALKABLE, cell=10)
+    field.set_goal(45, 5)
+    field.refresh()
+    assert field.goal == (4, 0)
+    assert field.distance[0, 4] == 0
+    # straight steps only: down to the gap, across and back up
+    assert field.distance[0, 0] == 10
+    assert field.distance[3, 2] == 5
+    assert (field.distance[~WALKABLE] == UNREACHABLE).all()
+
+
+def test_directions_point_downhill_without_cutting_corners():
+    field = FlowField(WALKABLE, cell=10)
+    field.set_goal(45, 5)
+    d = field.sample([[15, 5], [25, 35], [35, 35], [45, 5], [-5, 5], [25, 5]])
+    assert np.allclose(d[0], (0, 1))
+    # in the gap the wall is above, so no diagonal past its corner
+    assert np.allclose(d[1], (1, 0))
+    assert np.allclose(d[2], (np.sqrt(.5), -np.sqrt(.5)))
+    # the goal cell and outside the grid stay still, a wall cell points back out
+    assert not d[3:5].any()
+    assert np.allclose(d[5], (1, 0))
+
+
+def test_goal_and_walls_only_recompute_when_changed():
+    field = FlowField(WALKABLE, cell=10)
+    field.set_goal(45, 5)
+    field.refresh()
+    field.set_goal(41, 9)
+    assert not field.dirty
+    field.set_blocked(2, 3)
+    assert field.dirty
+    # the left side is cut off now, so it has nowhere to go
+    assert not field.sample([[5, 5], [15, 25]]).any()
+    assert field.distance[0, 0] == UNREACHABLE
+
+
+def test_from_occupancy_reads_tiles_inside_bounds():
+    occupancy = OccupancyGrid(tile=40, chunk_tiles=4)
+    occupancy.fill(pygame.Rect(-40, 0, 40, 40), 'Wall')
+    occupancy.fill(pygame.Rect(120, 80, 80, 40), 'Workbench')
+    occupancy.fill(pygame.Rect(0, 120, 40, 40), 'Door')
+    field = FlowField.from_occupancy(occupancy, pygame.Rect(-80, 0, 320, 200), passable=('Door',))
+    assert field.walkable.shape == (5, 8)
+    assert tuple(field.origin) == (-80, 0)
+    blocked = {(int(x), int(y)) for y, x in zip(*np.nonzero(~field.walkable))}
+    assert blocked == {(1, 0), (5, 2), (6, 2)}
+    assert field.cell_at(-80, 0) == (0, 0) and field.cell_at(-81, 0) is None
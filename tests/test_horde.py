@@ -0,0 +1,49 @@
+import numpy as np
+
+from systems.horde import ALERT, CHASE, ENEMY_SIZE, IDLE, Horde
+
+
+def test_stacked_enemies_spread_apart():
+    horde = Horde()
+    horde.spawn(np.full(20, 500.0), np.full(20, 500.0))
+    # the target is far away, so only separation moves them
+    for _ in range(30):
+        horde.update(50, (5000, 5000))
+    pos = horde.pos[:horde.count]
+    gaps = np.hypot(*(pos[:, None] - pos[None]).transpose(2, 0, 1))
+    assert gaps[~np.eye(20, dtype=bool)].min() > 1
+    assert np.ptp(pos, axis=0).min() > ENEMY_SIZE
+    assert (horde.state[:horde.count] == IDLE).all()
+
+
+def test_update_chases_in_range_and_follows_noise():
+    class Noise:
+        def sample(self, points):
+            return np.ones(len(points))
+
+        def gradient(self, points):
+            return np.tile([0.0, 1.0], (len(points), 1))
+
+    horde = Horde()
+    horde.spawn([0.0, 1000.0, 2000.0], [0.0, 0.0, 0.0])
+    target = (100 + ENEMY_SIZE / 2, ENEMY_SIZE / 2)
+    horde.update(100, target, noise=Noise())
+    assert list(horde.state[:3]) == [CHASE, ALERT, ALERT]
+    assert horde.pos[0, 0] > 0
+    assert horde.pos[1, 1] > 0 and horde.pos[2, 1] > 0
+    # capacity grows past the initial arrays
+    horde.spawn(np.zeros(100), np.zeros(100))
+    assert len(horde) == 103
+
+
+def test_cone_hits_damage_and_cull_keep_order():
+    horde = Horde()
+    half = ENEMY_SIZE // 2
+    horde.spawn(np.array([100, -100, 0, 60]) - half, np.array([0, 0, 100, 0]) - half, hp=2)
+    hits = horde.cone_hits((0, 0), 0, 90, 120)
+    assert list(hits) == [0, 3]
+    horde.damage(hits, 2)
+    assert horde.cull() == 2
+    assert len(horde) == 2
+    assert np.allclose(horde.pos[:2] + half, [[-100, 0], [0, 100]])
+    assert horde.cull() == 0
@@ -0,0 +1,59 @@
+import numpy as np
+
+from systems.noise_field import NoiseField
+
+
+def test_gradient_is_cached_per_step():
+    field = NoiseField((6, 8), cell=10)
+    field.deposit(35, 25, 50)
+    points = np.array([[15.0, 25.0], [55.0, 25.0]])
+    # deposits are only heard once a step has run
+    assert not field.gradient(points).any()
+    field.update(NoiseField.TICK_MS)
+    gy, gx = np.gradient(field.grid)
+    expected = np.stack([gx[2, [1, 5]], gy[2, [1, 5]]], axis=1)
+    assert np.allclose(field.gradient(points), expected)
+    # listeners on either side climb toward the source
+    assert field.gradient(points)[0, 0] > 0 > field.gradient(points)[1, 0]
+
+
+def test_spread_keeps_the_total_without_a_hot_spot():
+    field = NoiseField((6, 8), cell=10)
+    field.spread(96)
+    field.update(NoiseField.TICK_MS)
+    assert np.allclose(field.grid, field.grid[0, 0])
+    assert field.grid.max() < 3
+    assert not field.gradient(np.array([[5.0, 5.0]])).any()
+
+
+def _loud_tick(raid, x, y, now):
+    raid.game.sim_time_ms = now
+    raid.noise_field.deposit(x, y, 100)
+    raid.noise_field.step()
+    raid._noise_tick()
+
+
+def test_raid_escalation_reads_local_noise(game):
+    game.switch_scene('raid')
+    raid = game.current_scene
+    raid.horde.clear()
+    raid.last_escalation = 0
+    far = raid.FIELD_BOUNDS
+    px, py = raid.player_pos[0] + 20, raid.player_pos[1] + 20
+    # loud, but nobody is there to hear it
+    _loud_tick(raid, far.right - 1, far.bottom - 1, raid.ESCALATION_MS)
+    assert raid.horde_level == 0
+    # the HUD reads the map-wide total
+    assert raid.noise == raid.noise_field.total() > raid.ESCALATION_INTENSITY
+    # loud at the player grows the horde around the loudest spot
+    _loud_tick(raid, px, py, raid.ESCALATION_MS)
+    assert raid.horde_level == 1 and len(raid.horde) == 3
+    # not again before ESCALATION_MS has passed
+    _loud_tick(raid, px, py, raid.ESCALATION_MS * 2 - 1)
+    assert raid.horde_level == 1
+    # an enemy hearing it is enough, even far from the player
+    ex, ey = raid.horde.pos[0] + 15
+    raid.noise_field.clear()
+    _loud_tick(raid, ex, ey, raid.ESCALATION_MS * 2)
+    assert raid.heard >= raid.ESCALATION_INTENSITY
+    assert raid.horde_level == 2
@@ -0,0 +1,44 @@
+import pygame
+
+from systems.occupancy import CHUNK_TILES, EMPTY, STRUCTURE_IDS, TILE, UNKNOWN, OccupancyGrid
+
+
+def test_fill_covers_every_tile_of_a_multi_tile_rect():
+    grid = OccupancyGrid()
+    bench = pygame.Rect(2 * TILE, 3 * TILE, 2 * TILE, TILE)
+    grid.fill(bench, 'Workbench')
+    assert grid.get(2, 3) == grid.get(3, 3) == STRUCTURE_IDS['Workbench']
+    assert grid.get(4, 3) == grid.get(1, 3) == grid.get(2, 4) == EMPTY
+    assert grid.kind_at(bench.right - 1, bench.centery) == 'Workbench'
+    assert grid.kind_at(bench.right, bench.centery) is None
+    assert not grid.is_free(pygame.Rect(3 * TILE, 2 * TILE, TILE, 2 * TILE))
+    assert grid.is_free(pygame.Rect(4 * TILE, 3 * TILE, TILE, TILE))
+    grid.clear(bench)
+    assert grid.is_free(bench)
+
+
+def test_rects_across_chunks_and_negative_coordinates():
+    grid = OccupancyGrid()
+    edge = (CHUNK_TILES - 1) * TILE
+    wall = pygame.Rect(edge, -TILE, 2 * TILE, 2 * TILE)
+    grid.fill(wall, 'Wall')
+    assert len(grid.chunks) == 4
+    assert grid.tiles(wall) == [(CHUNK_TILES - 1, -1), (CHUNK_TILES, -1), (CHUNK_TILES - 1, 0), (CHUNK_TILES, 0)]
+    assert all(grid.get(tx, ty) == STRUCTURE_IDS['Wall'] for tx, ty in grid.tiles(wall))
+    # clearing never allocates chunks that were not there
+    grid.clear(pygame.Rect(-10 * TILE, -10 * TILE, TILE, TILE))
+    assert len(grid.chunks) == 4
+
+
+def test_rebuild_from_saved_structures():
+    grid = OccupancyGrid()
+    grid.fill(pygame.Rect(0, 0, TILE, TILE), 'Door')
+    grid.rebuild([
+        {'type': 'Workbench', 'rect': pygame.Rect(0, 0, TILE, TILE)},
+        {'type': 'Workbench', 'rect': pygame.Rect(TILE, 0, TILE, TILE)},
+        {'type': 'Statue', 'rect': pygame.Rect(0, TILE, TILE, TILE)},
+    ])
+    # two legacy one-tile workbenches side by side, and an unknown kind
+    assert grid.get(0, 0) == grid.get(1, 0) == STRUCTURE_IDS['Workbench']
+    assert grid.get(0, 1) == UNKNOWN
+    assert grid.kind_at(5, TILE + 5) == 'unknown'
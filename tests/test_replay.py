@@ -0,0 +1,61 @@
+import pygame
+
+from bench.scenarios import ScriptedInput, click_events, key_event
+from main import Game
+from systems import save_load
+from systems.replay import Replay
+
+
+def _state(game):
+    scene = game.current_scene
+    n = scene.horde.count
+    return (game.current_scene_name, game.sim_time_ms, scene.horde.pos[:n].round(6).tolist(),
+            scene.horde.hp[:n].tolist(), [loot['item'] for loot in scene.loot_items],
+            [round(p, 6) for p in scene.player_pos], scene.weather, scene.noise)
+
+
+def _held(*scancodes):
+    # the recorder lists held keys by scancode, like pygame.key.get_pressed()
+    held = [False] * len(pygame.key.get_pressed())
+    for code in scancodes:
+        held[code] = True
+    return pygame.key.ScancodeWrapper(held)
+
+
+def _play(game, frames=400):
+    game.input = ScriptedInput()
+    start = game.current_scene.buttons[0].rect.center
+    for i in range(frames):
+        game.input.keys = _held(pygame.KSCAN_D) if i > 60 and (i // 40) % 2 == 0 else _held()
+        game.input.mouse_pos = (300, 200) if i > 10 else start
+        events = []
+        if i == 5:
+            events = click_events(start)
+        elif i == 40:
+            events = [key_event(pygame.K_m)]
+        elif i > 60 and i % 15 == 0:
+            events = click_events((300, 200))
+        # uneven frame times, so ticks per frame vary
+        game.frame(16 + i % 3, events)
+
+
+def test_replay_reproduces_the_recorded_run(save_dir, tmp_path):
+    save_load.new_game(1, 'recorded')
+    save_load.set_active_slot(1)
+    save_load.session.close()
+    path = str(tmp_path / 'run.rec.gz')
+    game = Game(seed=42, render_size=(640, 360))
+    game.start_recording(path)
+    _play(game)
+    game.recorder.close()
+    recorded = _state(game)
+    assert recorded[0] == 'raid'
+    save_load.session.close()
+
+    replay = Replay(path)
+    assert len(replay.frames) == 400
+    save_load.use_save_dir(str(tmp_path / 'replay'))
+    replay.restore_saves(save_load.SAVE_DIR)
+    game = Game(seed=replay.seed, render_size=replay.render_size, sim_hz=replay.sim_hz)
+    game.run_replay(replay)
+    assert _state(game) == recorded
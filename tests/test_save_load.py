@@ -0,0 +1,202 @@
+import json
+import os
+import time
+
+import pytest
+
+from systems import save_load
+
+
+def test_mixed_inventory_round_trip(save_dir):
+    save_load.new_game(0, 'mixed')
+    save_load.save_inventory([
+        {"item": "Wood", "qty": 5, "slot": 0},
+        "Stone",
+        {"item": "Cloth", "qty": 2, "slot": 1},
+        "Stone",
+        "Wood",
+    ])
+    save_load._sync_session()
+    expected = [
+        {"item": "Wood", "qty": 5},
+        {"item": "Cloth", "qty": 2},
+        {"item": "Stone", "qty": 2},
+        {"item": "Wood", "qty": 1},
+    ]
+    assert save_load.load_inventory() == expected
+    save_load.session.discard()
+    assert save_load.load_inventory(0) == expected
+
+
+def test_meta_write_is_served_until_it_lands(save_dir):
+    save_load.new_game(1, 'first')
+    meta = save_load._read_meta()
+    meta['slots']['1']['name'] = 'renamed'
+    save_load._write_meta(meta)
+    # a stale file on disk must not replace the newer cached copy
+    assert save_load._read_meta()['slots']['1']['name'] == 'renamed'
+    save_load.session.wait()
+    assert save_load._meta_cache.in_flight == 0
+    save_load._meta_cache.__init__()
+    assert save_load._read_meta()['slots']['1']['name'] == 'renamed'
+
+
+def test_flush_meta_is_ordered_after_direct_writes(save_dir):
+    save_load.new_game(1, 'one')
+    save_load.new_game(2, 'two')
+    save_load.set_active_slot(1)
+    save_load.session.record('set', ['raid', 'noise'], 5)
+    save_load.session.flush()
+    save_load.set_active_slot(2)
+    save_load.session.wait()
+    save_load._meta_cache.__init__()
+    assert save_load.get_active_slot() == 2
+
+
+def test_delete_journal_only_slot_keeps_a_version(save_dir):
+    save_load.save_inventory([{"item": "Wood", "qty": 7}])
+    save_load._sync_session()
+    slot = save_load.session.slot
+    assert not save_load.os.path.exists(save_load._slot_file(slot))
+    assert save_load.os.path.exists(save_load._journal_file(slot))
+    save_load.delete_slot(slot)
+    versions = save_load.list_versions(slot)
+    assert versions
+    assert save_load.restore_version(slot, versions[-1]['id'])
+    assert save_load.load_inventory(slot) == [{"item": "Wood", "qty": 7}]
+
+
+def _fail_first(monkeypatch, name):
+    real = getattr(save_load._Writer, name)
+    calls = []
+    def flaky(self, *args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise OSError('disk full')
+        return real(self, *args)
+    monkeypatch.setattr(save_load._Writer, name, flaky)
+    return calls
+
+
+def test_failed_journal_append_is_retried_and_raised(save_dir, monkeypatch):
+    save_load.new_game(1, 'flaky')
+    calls = _fail_first(monkeypatch, '_append')
+    save_load.save_inventory([{"item": "Wood", "qty": 3}])
+    save_load.session.flush()
+    save_load.session.wait()
+    # a later append to the same slot must not overtake the failed one
+    save_load.save_raid_state(noise=9)
+    with pytest.raises(OSError):
+        save_load.session.flush()
+    save_load.session.flush()
+    save_load.session.wait()
+    assert len(calls) == 3
+    save_load.session.discard()
+    data = save_load.load_save(1)
+    assert data['inventory'] == [{"item": "Wood", "qty": 3, "slot": 0}]
+    assert data['raid']['noise'] == 9
+
+
+def test_failed_meta_write_is_retried(save_dir, monkeypatch):
+    save_load.new_game(1, 'meta')
+    save_load.session.wait()
+    real = save_load._save_text
+    calls = []
+    def flaky(path, text):
+        if path == save_load.META_FILE:
+            calls.append(text)
+            if len(calls) == 1:
+                raise OSError('read-only')
+        return real(path, text)
+    monkeypatch.setattr(save_load, '_save_text', flaky)
+    meta = save_load._read_meta()
+    meta['slots']['1']['name'] = 'renamed'
+    save_load._write_meta(meta)
+    save_load.session.wait()
+    # the unwritten copy is still what readers see
+    assert save_load._read_meta()['slots']['1']['name'] == 'renamed'
+    with pytest.raises(OSError):
+        save_load.session.flush()
+    save_load.session.wait()
+    assert len(calls) == 2
+    save_load._meta_cache.__init__()
+    assert save_load._read_meta()['slots']['1']['name'] == 'renamed'
+
+
+def _wait_for_preview(slot):
+    for _ in range(200):
+        preview = save_load.get_preview(slot)
+        if preview is not None:
+            return preview
+        time.sleep(0.01)
+    return None
+
+
+def test_appends_leave_the_preview_until_it_is_refreshed(save_dir):
+    save_load.new_game(1, 'preview')
+    save_load.session.wait()
+    summary = save_load._summary_file(1)
+    before = save_load.os.stat(summary).st_mtime_ns
+    save_load.save_inventory([{"item": "Wood", "qty": 4}])
+    save_load.session.flush()
+    save_load.session.wait()
+    assert save_load.os.stat(summary).st_mtime_ns == before
+    save_load.session.refresh_preview()
+    save_load.session.wait()
+    assert save_load._load_json(summary, None)['items'] == {"Wood": 4}
+
+
+def test_missing_preview_is_built_on_request(save_dir):
+    save_load.new_game(1, 'old')
+    save_load.save_inventory([{"item": "Stone", "qty": 2}])
+    save_load.session.close()
+    for path in (save_load._summary_file(1), save_load._thumb_file(1)):
+        save_load.os.remove(path)
+    save_load.request_preview(1)
+    summary, thumb = _wait_for_preview(1)
+    assert summary['items'] == {"Stone": 2}
+    assert thumb.get_size() == save_load.slot_preview.THUMB_SIZE
+
+
+def test_journal_replays_over_the_snapshot_and_skips_a_torn_tail(save_dir):
+    save_load.new_game(1, 'journal')
+    save_load.set_active_slot(1)
+    save_load.add_structure({'type': 'Wall'})
+    save_load.add_structures([{'type': 'Door'}, {'type': 'FarmPlot'}])
+    save_load.remove_structure(0)
+    save_load.save_raid_state(noise=12)
+    save_load._sync_session()
+    slot = save_load.session.slot
+    # as if the game crashed mid-append: nothing cached survives
+    save_load.session.discard(slot)
+    with open(save_load._journal_file(slot), 'a') as f:
+        f.write('{"op":"set","path":["raid","noi')
+    data, seq, _ = save_load._read_slot(slot)
+    assert [s['type'] for s in data['base']['placed_structures']] == ['Door', 'FarmPlot']
+    assert data['raid']['noise'] == 12
+    assert seq == 4
+    # the next append cuts the torn line instead of gluing onto it
+    save_load.session.open(slot)
+    save_load.save_raid_state(noise=30)
+    save_load._sync_session()
+    save_load.session.discard()
+    assert save_load._read_slot(slot)[0]['raid']['noise'] == 30
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(save_dir, monkeypatch):
+    monkeypatch.setattr(save_load, 'JOURNAL_COMPACT_BYTES', 512)
+    save_load.new_game(1, 'compact')
+    save_load.set_active_slot(1)
+    for i in range(20):
+        save_load.add_structure({'type': 'Wall'})
+    save_load._sync_session()
+    slot = save_load.session.slot
+    # the snapshot holds everything and records how far the journal got
+    with open(save_load._slot_file(slot)) as f:
+        snapshot = json.load(f)
+    assert len(snapshot['base']['placed_structures']) == 20
+    assert snapshot['journal_seq'] == 20
+    assert os.path.getsize(save_load._journal_file(slot)) == 0
+    assert save_load.list_versions(slot)
+    save_load.session.discard()
+    assert len(save_load.load_save(slot)['base']['placed_structures']) == 20
@@ -0,0 +1,122 @@
+import pygame
+
+from bench.scenarios import KeySet
+from systems import save_load
+from systems.occupancy import TILE
+
+
+def test_leaving_raid_flushes_its_exit_writes(game):
+    game.switch_scene('raid')
+    game.current_scene.noise = 42
+    game.current_scene.weather = 'rain'
+    game.switch_scene('base')
+    assert save_load.session.pending == []
+    save_load._sync_session()
+    save_load.session.discard()
+    raid = save_load.load_save(1)['raid']
+    assert (raid['noise'], raid['weather']) == (42, 'rain')
+
+
+def test_leaving_base_flushes_its_exit_writes(game):
+    game.switch_scene('base')
+    game.current_scene.player_pos = [123, 456]
+    game.switch_scene('menu')
+    assert save_load.session.pending == []
+
+
+def test_reentering_a_loud_raid_does_not_escalate(game):
+    save_load.save_raid_state(noise=200)
+    game.switch_scene('raid')
+    raid = game.current_scene
+    loudest = 0
+    for _ in range(int(raid.ESCALATION_MS * 1.5 / game.dt_ms)):
+        game.sim_time_ms += game.dt_ms
+        raid.update()
+        loudest = max(loudest, raid.heard)
+    # the restored total is a background, not a source at the spawn point
+    assert loudest < raid.horde.HEARING
+    assert raid.horde_level == 0
+
+
+def _drag(base, kind, start, end, shift=False):
+    base.build_mode = True
+    base.build_selected = base.build_catalog.index(kind)
+    cx, cy = base.camera
+    base.build_drag = (start[0], start[1])
+    base.game.input.mouse_pos = (end[0] * TILE - cx + 5, end[1] * TILE - cy + 5)
+    base.game.input.keys = KeySet([pygame.K_LSHIFT] if shift else [])
+    return base._drag_rects()
+
+
+def test_drag_places_a_row_of_multi_tile_footprints(game):
+    game.switch_scene('base')
+    base = game.current_scene
+    base.add_item('Wood', 50); base.add_item('Metal', 20)
+    # a row along the longer axis, one footprint per two tiles
+    rects = _drag(base, 'Workbench', (10, 10), (15, 11))
+    assert [(r.x // TILE, r.y // TILE, r.w // TILE, r.h // TILE) for r in rects] == \
+        [(10, 10, 2, 1), (12, 10, 2, 1), (14, 10, 2, 1)]
+    base.try_place_structures(rects)
+    assert all(base.occupancy.kind_at(x * TILE, 10 * TILE) == 'Workbench' for x in range(10, 16))
+    assert base.count_item('Wood') == 50 - 3 * 5
+    # overlapping footprints are skipped, free ones still go down
+    base.try_place_structures(_drag(base, 'Workbench', (15, 10), (18, 10)))
+    assert base.occupancy.kind_at(18 * TILE, 10 * TILE) == 'Workbench'
+    assert base.occupancy.kind_at(19 * TILE, 10 * TILE) is None
+    assert len(base.placed_structures) == 4
+    # one journal write for the whole drag, and the saved rects keep their size
+    save_load._sync_session()
+    saved = save_load.load_save()['base']['placed_structures']
+    assert [s['rect']['w'] for s in saved] == [2 * TILE] * 4
+
+
+def test_shift_drag_fills_a_rectangle(game):
+    game.switch_scene('base')
+    base = game.current_scene
+    base.add_item('Wood', 100)
+    rects = _drag(base, 'Wall', (20, 20), (22, 21), shift=True)
+    assert len(rects) == 6
+    base.try_place_structures(rects)
+    assert all(base.occupancy.kind_at(x * TILE, y * TILE) == 'Wall' for x in range(20, 23) for y in range(20, 22))
+
+
+def _saved_walls(count):
+    walls = [{"type": "Wall", "rect": pygame.Rect((i % 100) * TILE, (i // 100) * TILE, TILE, TILE)}
+             for i in range(count)]
+    save_load.save_base_state(placed_structures=walls)
+
+
+def _run_until_preloading(game):
+    for _ in range(100):
+        game.frame(game.dt_ms, [])
+        if game.preloading is not None:
+            return
+    raise AssertionError('preload never started')
+
+
+def test_preload_spreads_base_loading_over_frames(game):
+    _saved_walls(1000)
+    game.switch_scene('raid')
+    _run_until_preloading(game)
+    base = game.preloading[1]
+    counts = []
+    while game.preloading is not None:
+        game.frame(game.dt_ms, [])
+        counts.append(len(base.placed_structures))
+    steps = [b - a for a, b in zip([0] + counts, counts)]
+    assert max(steps) <= base.LOAD_BATCH and len(steps) > 1000 // base.LOAD_BATCH
+    assert game.scene_cache['base'][0] is base
+    game.switch_scene('base')
+    assert game.current_scene is base
+    assert not base.occupancy.is_free(pygame.Rect(999 % 100 * TILE, 999 // 100 * TILE, TILE, TILE))
+
+
+def test_switching_mid_preload_finishes_it(game):
+    _saved_walls(1000)
+    game.switch_scene('raid')
+    _run_until_preloading(game)
+    base = game.preloading[1]
+    game.switch_scene('base')
+    assert game.preloading is None
+    assert game.current_scene is base
+    assert len(base.placed_structures) == 1000
@@ -0,0 +1,51 @@
+import pygame
+
+from systems.spatial_hash import SpatialHash
+
+
+def _filled():
+    grid = SpatialHash(cell_size=64)
+    objs = [{'n': i} for i in range(6)]
+    rects = [(0, 0, 40, 40), (100, 0, 40, 40), (50, 50, 100, 100), (300, 300, 40, 40), (-90, -90, 40, 40), (10, 10, 20, 20)]
+    for obj, rect in zip(objs, rects):
+        grid.insert(obj, rect)
+    return grid, objs
+
+
+def test_rect_query_matches_a_scan_in_insertion_order():
+    grid, objs = _filled()
+    area = pygame.Rect(20, 20, 100, 40)
+    expected = [o for o in objs if grid.entries[id(o)][1].colliderect(area)]
+    assert grid.query_rect(area) == expected == [objs[0], objs[1], objs[2], objs[5]]
+    assert grid.query_rect((-100, -100, 30, 30)) == [objs[4]]
+    assert grid.query_rect((1000, 1000, 5, 5)) == []
+
+
+def test_move_and_remove_update_the_buckets():
+    grid, objs = _filled()
+    grid.move(objs[3], (0, 0, 40, 40))
+    # moving keeps the original insertion order
+    assert grid.query_rect((0, 0, 10, 10)) == [objs[0], objs[3]]
+    assert grid.query_rect((300, 300, 40, 40)) == []
+    grid.remove(objs[0])
+    grid.remove(objs[0])
+    assert objs[0] not in grid and len(grid) == 5
+    assert grid.query_rect((0, 0, 10, 10)) == [objs[3]]
+    # inserting a tracked object again moves it
+    grid.insert(objs[3], (500, 500, 10, 10))
+    assert len(grid) == 5 and grid.query_rect((500, 500, 1, 1)) == [objs[3]]
+    assert all(grid.cells.values())
+
+
+def test_radius_and_cone_use_rect_centres():
+    grid, objs = _filled()
+    # centres: 0 and 5 -> (20, 20), 1 -> (120, 20), 2 -> (100, 100), about 113 away
+    assert grid.query_radius((20, 20), 0) == [objs[0], objs[5]]
+    assert grid.query_radius((20, 20), 100) == [objs[0], objs[1], objs[5]]
+    assert grid.query_radius((20, 20), 99.9) == [objs[0], objs[5]]
+    assert grid.query_radius((20, 20), 114) == [objs[0], objs[1], objs[2], objs[5]]
+    # a centre on the origin itself counts as straight ahead at angle 0
+    assert grid.query_cone((20, 20), 0, 30, 150) == [objs[0], objs[1], objs[5]]
+    assert grid.query_cone((20, 20), 45, 30, 150) == [objs[2]]
+    assert grid.query_cone((120, 20), 180, 10, 150) == [objs[0], objs[5]]
+    assert grid.query_cone((120, 20), 180, 10, 90) == []
@@ -0,0 +1,8 @@
+def collect_dirty(widgets):
+    # rects of widgets that changed since the last call, clearing their flags
+    rects = []
+    for w in widgets:
+        if w.dirty:
+            rects.append(w.rect.copy())
+            w.dirty = False
+    return rects
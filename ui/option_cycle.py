@@ -1,4 +1,5 @@
 import pygame
+from systems import text_cache
 
 class OptionCycle:
     def __init__(self, label, pos, options, index=0, callback=None):
@@ -7,7 +8,7 @@ class OptionCycle:
         self.options = options
         self.index = index
         self.callback = callback
-        self.font = pygame.font.SysFont(None, 28)
+        self.font = text_cache.get_font(28)
         self.left_rect = pygame.Rect(pos[0], pos[1], 40, 40)
         self.right_rect = pygame.Rect(pos[0]+240, pos[1], 40, 40)
         self.value_rect = pygame.Rect(pos[0]+50, pos[1], 190, 40)
@@ -18,11 +19,11 @@ class OptionCycle:
     def draw(self, surface):
         pygame.draw.rect(surface, (80,80,80), self.left_rect, border_radius=8)
         pygame.draw.rect(surface, (80,80,80), self.right_rect, border_radius=8)
-        surface.blit(self.font.render('<', True, (255,255,255)), (self.left_rect.x+12, self.left_rect.y+10))
-        surface.blit(self.font.render('>', True, (255,255,255)), (self.right_rect.x+12, self.right_rect.y+10))
+        surface.blit(text_cache.render(self.font, '<', (255,255,255)), (self.left_rect.x+12, self.left_rect.y+10))
+        surface.blit(text_cache.render(self.font, '>', (255,255,255)), (self.right_rect.x+12, self.right_rect.y+10))
         pygame.draw.rect(surface, (60,60,60), self.value_rect, border_radius=8)
         pygame.draw.rect(surface, (30,30,30), self.value_rect, 2, border_radius=8)
-        surface.blit(self.font.render(f'{self.label}: {self._text()}', True, (255,255,255)), (self.value_rect.x+8, self.value_rect.y+8))
+        surface.blit(text_cache.render(self.font, f'{self.label}: {self._text()}', (255,255,255)), (self.value_rect.x+8, self.value_rect.y+8))
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -1,4 +1,5 @@
 import pygame
+from systems import text_cache
 
 class Toggle:
     def __init__(self, label, pos, state=False, callback=None):
@@ -6,7 +7,7 @@ class Toggle:
         self.pos = pos
         self.state = state
         self.callback = callback
-        self.font = pygame.font.SysFont(None, 28)
+        self.font = text_cache.get_font(28)
         self.rect = pygame.Rect(pos[0], pos[1], 180, 40)
 
     def draw(self, surface):
@@ -14,7 +15,7 @@ class Toggle:
         knob_x = self.rect.x + (self.rect.width - 40 if self.state else 0)
         pygame.draw.rect(surface, (120,120,120), (self.rect.x, self.rect.y, self.rect.width, self.rect.height), 2, border_radius=10)
         pygame.draw.rect(surface, (200,200,200), (knob_x, self.rect.y, 40, 40), border_radius=10)
-        surface.blit(self.font.render(self.label, True, (255,255,255)), (self.rect.right + 12, self.rect.y + 8))
+        surface.blit(text_cache.render(self.font, self.label, (255,255,255)), (self.rect.right + 12, self.rect.y + 8))
 
     def handle_event(self, event):
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1: